@@ -0,0 +1,226 @@
+"""
+_encode_numba.py
+Numba (nopython) kernels for sudoku_to_cnf.py.
+
+Builds the same clauses, in the same order, as encode() — but as a flat
+int32 literal buffer plus clause offsets (CSR layout) — and renders the
+DIMACS clause lines straight from that buffer, so no Python list or str
+is made per clause.  encode()'s dedup option is supported too: block
+pairs are skipped in _clauses and repeated definedness clauses dropped
+by _dedup (an open-addressing table).  convert_file() uses it for the
+clause section; the header (SIZE / MAP / FIXED / p lines) is still
+written in Python.
+
+Importing this module raises ImportError when numba/numpy are missing;
+sudoku_to_cnf.py then falls back to encode() + to_dimacs_bytes().
+"""
+
+import math
+from functools import lru_cache
+
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True, boundscheck=False)
+def _clauses(pos, units, per_kind, cross):
+    """
+    pos[i] : DIMACS variable of flat triple i, 0 for V-, -1 for V+.
+    units  : one row of n flat indices per constraint, grouped by kind
+             (cell, row, col, block), per_kind rows each.
+    For each kind, definedness then uniqueness, as in encode(); with cross
+    block uniqueness skips pairs in one row or column (row/col cover them).
+    Returns (literals, offsets): clause k is literals[offsets[k]:offsets[k+1]].
+    """
+    U, n = units.shape
+    lits = np.empty(U * n * n, np.int32)
+    offs = np.empty(U * (n * (n - 1) // 2 + 1) + 1, np.int64)
+    offs[0] = 0
+    k = m = 0
+    live = np.empty(n, np.int32)
+    at   = np.empty(n, np.int64)          # position in the unit of live[i]
+    box  = int(round(n ** 0.5))
+
+    for lo in range(0, U, per_kind):
+        # definedness: skip if some literal is V+, drop V- literals
+        for u in range(lo, lo + per_kind):
+            start, sat = k, False
+            for t in range(n):
+                l = pos[units[u, t]]
+                if l == -1:
+                    sat = True
+                    break
+                if l > 0:
+                    lits[k] = l
+                    k += 1
+            if sat:
+                k = start
+            elif k > start:
+                m += 1
+                offs[m] = k
+
+        # uniqueness: ¬a ∨ ¬b per pair; V- makes the pair true, V+ drops ¬x
+        blk = cross and lo == 3 * per_kind
+        for u in range(lo, lo + per_kind):
+            cnt = 0
+            for t in range(n):
+                l = pos[units[u, t]]
+                if l != 0:
+                    live[cnt] = l
+                    at[cnt] = t
+                    cnt += 1
+            for i in range(cnt):
+                a = live[i]
+                for j in range(i + 1, cnt):
+                    if blk and (at[i] // box == at[j] // box or
+                                at[i] % box == at[j] % box):
+                        continue
+                    b = live[j]
+                    if a != -1:
+                        lits[k] = -a
+                        k += 1
+                    if b != -1:
+                        lits[k] = -b
+                        k += 1
+                    if a != -1 or b != -1:
+                        m += 1
+                        offs[m] = k
+
+    return lits[:k], offs[:m + 1]
+
+
+@njit(cache=True, boundscheck=False)
+def _dedup(lits, offs):
+    """
+    Keep the first of each set of equal definedness clauses (the only kind
+    that can repeat, see encode()), compacting lits/offs in place.  Equal
+    clauses always have the same literal order, so they are compared
+    literal by literal; uniqueness clauses (negative literals) pass through.
+    """
+    m    = offs.size - 1
+    size = 1
+    while size < 2 * m:
+        size <<= 1
+    mask  = size - 1
+    table = np.zeros(size, np.int32)        # kept clause index + 1; 0 = empty
+    k = out = 0
+    e = offs[0]
+    for c in range(m):
+        s, e = e, offs[c + 1]
+        j, dup = 0, False
+        if lits[s] > 0:                     # definedness: look it up
+            h = e - s
+            for i in range(s, e):
+                h = h * 1000003 + lits[i]
+            h ^= h >> 29
+            j = h & mask
+            while table[j] != 0:
+                d = table[j] - 1
+                a, b = offs[d], offs[d + 1]
+                if b - a == e - s:
+                    dup = True
+                    for i in range(e - s):
+                        if lits[a + i] != lits[s + i]:
+                            dup = False
+                            break
+                    if dup:
+                        break
+                j = (j + 1) & mask
+            if dup:
+                continue
+            table[j] = out + 1
+        for i in range(s, e):               # k <= s: never overwrites unread data
+            lits[k] = lits[i]
+            k += 1
+        out += 1
+        offs[out] = k
+    return lits[:k], offs[:out + 1]
+
+
+@njit(cache=True, boundscheck=False)
+def _render(lits, offs):
+    """ASCII "l l ... 0\\n" per clause, as a uint8 buffer."""
+    size = 0
+    for i in range(lits.size):
+        v = lits[i]
+        size += 2 if v < 0 else 1          # sign + trailing space
+        v = abs(v)
+        while True:
+            size += 1
+            v //= 10
+            if v == 0:
+                break
+    size += 2 * (offs.size - 1)             # "0\n"
+
+    out = np.empty(size, np.uint8)
+    p = 0
+    for c in range(offs.size - 1):
+        for i in range(offs[c], offs[c + 1]):
+            v = lits[i]
+            if v < 0:
+                out[p] = 45                 # '-'
+                p += 1
+                v = -v
+            e = p
+            while True:
+                e += 1
+                v //= 10
+                if v == 0:
+                    break
+            v = abs(lits[i])
+            q = e
+            while True:
+                q -= 1
+                out[q] = 48 + v % 10
+                v //= 10
+                if v == 0:
+                    break
+            out[e] = 32                     # ' '
+            p = e + 1
+        out[p] = 48                         # '0'
+        out[p + 1] = 10                     # '\n'
+        p += 2
+    return out
+
+
+@lru_cache(maxsize=8)
+def _units(n):
+    """Cell / row / col / block units of flat indices, in encode()'s order (read-only)."""
+    box = int(math.sqrt(n))
+    idx = np.arange(n ** 3, dtype=np.int64).reshape(n, n, n)          # [r, c, v]
+    cells  = idx.reshape(n * n, n)                                     # (r, c) -> v
+    rows   = idx.transpose(0, 2, 1).reshape(n * n, n)                  # (r, v) -> c
+    cols   = idx.transpose(1, 2, 0).reshape(n * n, n)                  # (c, v) -> r
+    blocks = (idx.reshape(box, box, box, box, n)                       # [br, dr, bc, dc, v]
+                 .transpose(0, 2, 4, 1, 3).reshape(n * n, n))          # (br, bc, v) -> (dr, dc)
+    return np.ascontiguousarray(np.concatenate((cells, rows, cols, blocks)))
+
+
+def clause_lines(n, V_plus, V0_list, dedup=False):
+    """
+    DIMACS clause section for the partition from sudoku_to_cnf.partition_vars
+    (dedup as in encode()).  Returns (bytes, number of clauses).
+    """
+    pos = np.zeros(n ** 3, np.int32)
+    if V0_list:
+        t = np.array(V0_list, np.int64) - 1
+        pos[(t[:, 0] * n + t[:, 1]) * n + t[:, 2]] = np.arange(1, len(V0_list) + 1)
+    if V_plus:
+        t = np.array(list(V_plus), np.int64) - 1
+        pos[(t[:, 0] * n + t[:, 1]) * n + t[:, 2]] = -1
+
+    lits, offs = _clauses(pos, _units(n), n * n, dedup)
+    if dedup:
+        lits, offs = _dedup(lits, offs)
+    return _render(lits, offs).tobytes(), offs.size - 1
+
+
+_warm = False
+
+def warm_up():
+    """Compile (or load from cache) the kernels once, outside any timed region."""
+    global _warm
+    if not _warm:
+        for dedup in (False, True):
+            clause_lines(4, {(1, 1, 1)}, [(1, 2, 2)], dedup)
+        _warm = True
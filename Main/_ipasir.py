@@ -0,0 +1,84 @@
+"""
+_ipasir.py
+ctypes wrapper around a SAT solver built as an IPASIR shared library
+(e.g. satch / CaDiCaL / MiniSat built as libipasir<name>.so).
+
+sat_solver_runner.run_solver() uses it when the solver it is given is a
+shared library instead of an executable: the CNF is loaded and solved
+in-process, so no solver process is started per puzzle.
+
+    python sat_solver_runner.py --solver executable/libipasirsatch.so
+"""
+
+import io
+import gzip
+import time
+import ctypes
+
+SAT, UNSAT = 10, 20
+LIB_EXTS   = (".so", ".dylib", ".dll")
+
+_TERMINATE = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_void_p)
+_libs      = {}
+
+
+def is_library(path):
+    return path.lower().endswith(LIB_EXTS)
+
+
+def _lib(path):
+    """Load (once per process) and type the IPASIR entry points of `path`."""
+    if path not in _libs:
+        lib = ctypes.CDLL(path)
+        lib.ipasir_init.restype      = ctypes.c_void_p
+        lib.ipasir_init.argtypes     = []
+        lib.ipasir_release.argtypes  = [ctypes.c_void_p]
+        lib.ipasir_add.argtypes      = [ctypes.c_void_p, ctypes.c_int32]
+        lib.ipasir_solve.restype     = ctypes.c_int
+        lib.ipasir_solve.argtypes    = [ctypes.c_void_p]
+        lib.ipasir_val.restype       = ctypes.c_int32
+        lib.ipasir_val.argtypes      = [ctypes.c_void_p, ctypes.c_int32]
+        lib.ipasir_set_terminate.argtypes = [ctypes.c_void_p, ctypes.c_void_p,
+                                             _TERMINATE]
+        _libs[path] = lib
+    return _libs[path]
+
+
+def solve_dimacs(lib_path, cnf_path, timeout=3600, data=None):
+    """
+    Solve a DIMACS file (.cnf or .cnf.gz) with the IPASIR library at
+    lib_path; if data (the plain DIMACS bytes) is given it is parsed
+    instead of reading cnf_path.
+    Returns (status, positive literals): status is SAT (10), UNSAT (20),
+    or 0 if the solver was stopped at the timeout.
+    """
+    lib      = _lib(lib_path)
+    deadline = time.time() + timeout
+    stop     = _TERMINATE(lambda _: time.time() >= deadline)
+    s        = lib.ipasir_init()
+    try:
+        lib.ipasir_set_terminate(s, None, stop)
+        add, num_vars = lib.ipasir_add, 0
+        if data is not None:
+            f = io.StringIO(data.decode())
+        elif cnf_path.endswith(".gz"):
+            f = gzip.open(cnf_path, "rt")
+        else:
+            f = open(cnf_path)
+        with f:
+            for line in f:
+                if line[:1] in ("c", "%", "\n", ""):
+                    continue
+                if line[:1] == "p":
+                    num_vars = int(line.split()[2])
+                    continue
+                for tok in line.split():
+                    add(s, int(tok))
+
+        status = lib.ipasir_solve(s)
+        if status != SAT:
+            return status, []
+        val = lib.ipasir_val
+        return status, [v for v in range(1, num_vars + 1) if val(s, v) > 0]
+    finally:
+        lib.ipasir_release(s)
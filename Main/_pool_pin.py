@@ -0,0 +1,36 @@
+"""
+_pool_pin.py
+Process pool whose workers are each pinned to their own core.
+
+benchmark.py and rerun_9x9_only.py both time the SAT and backtracking
+solvers across a pool; they load this module and build the pool with
+pinned_pool() so the two scripts pin workers the same way.
+"""
+
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+
+def pin_worker(counter):
+    """
+    Pool initializer (Linux): pin this worker to its own core, taking the
+    core index from a counter shared by the pool.  The SAT subprocess
+    inherits the affinity and the backtracker runs in the worker itself,
+    so both solvers get the same treatment.
+    """
+    with counter.get_lock():
+        core = counter.value
+        counter.value += 1
+    if hasattr(os, "sched_setaffinity"):
+        cpus = sorted(os.sched_getaffinity(0))
+        try:
+            os.sched_setaffinity(0, {cpus[core % len(cpus)]})
+        except OSError:
+            pass
+
+
+def pinned_pool(workers):
+    """ProcessPoolExecutor with `workers` workers, each run through pin_worker."""
+    return ProcessPoolExecutor(max_workers=workers, initializer=pin_worker,
+                               initargs=(multiprocessing.Value("i", 0),))
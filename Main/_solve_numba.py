@@ -0,0 +1,178 @@
+"""
+_solve_numba.py
+Numba (nopython) kernel for backtracking_solver.py.
+
+The search of solve_iterative — MRV over row / column / box bitmasks —
+but written as an explicit-stack DFS over flat int64 arrays so Numba can
+compile it to native code.  The bucket-free scan breaks MRV ties the way
+solve_iterative does: each cell carries a stamp, renewed whenever its
+candidate count changes or its frame is popped (when solve_iterative would
+re-insert it into a bucket), and the oldest stamp wins.
+
+The kernel runs in slices of SLICE_NODES nodes and keeps its whole state
+(grid, masks, stamps, stack, depth) in the arrays it is handed, so solve()
+simply re-enters it until it finishes.  Between slices control is back in
+Python, which is what lets the SIGALRM timeout in solve_puzzle still fire.
+
+Importing this module raises ImportError when numba/numpy are missing;
+backtracking_solver.py then falls back to the pure-Python search.
+"""
+
+import numpy as np
+from numba import njit
+
+SLICE_NODES = 1 << 16
+
+SOLVED, EXHAUSTED, PAUSED = 1, 0, 2
+
+
+@njit(cache=True, boundscheck=False)
+def _select(grid, row_mask, col_mask, box_mask, box_of, stamp, n, full):
+    """MRV scan (ties to the oldest stamp). Returns (cell, avail), cell -1 if full."""
+    best, best_cnt, best_avail = -1, n + 1, 0
+    for i in range(n * n):
+        if grid[i] == 0:
+            avail = ~(row_mask[i // n] | col_mask[i % n] | box_mask[box_of[i]]) & full
+            cnt, m = 0, avail
+            while m:
+                m &= m - 1
+                cnt += 1
+            if cnt < best_cnt or (cnt == best_cnt and stamp[i] < stamp[best]):
+                best, best_cnt, best_avail = i, cnt, avail
+                if cnt == 0:                     # wipeout
+                    break
+    return best, best_avail
+
+
+@njit(cache=True, boundscheck=False)
+def _stamp_peers(grid, row_mask, col_mask, box_mask, box_of, stamp, tick, n, box, i, bit):
+    """
+    Stamp the empty peers of i that `bit` is free for, in ascending index
+    order as _peer_table lists them: row by row, all of i's row, the box's
+    slice of a row in its band, otherwise just i's column.
+    """
+    r, c = i // n, i % n
+    br, bc = (r // box) * box, (c // box) * box
+    for rr in range(n):
+        lo, hi = c, c + 1
+        if rr == r:
+            lo, hi = 0, n
+        elif br <= rr < br + box:
+            lo, hi = bc, bc + box
+        for cc in range(lo, hi):
+            p = rr * n + cc
+            if p != i and grid[p] == 0 and \
+                    (row_mask[rr] | col_mask[cc] | box_mask[box_of[p]]) & bit == 0:
+                stamp[p] = tick[0]
+                tick[0] += 1
+
+
+@njit(cache=True, boundscheck=False)
+def _search(grid, row_mask, col_mask, box_mask, box_of, stamp, tick,
+            stack_cell, stack_rem, depth, n, box, budget):
+    """
+    Expand at most `budget` nodes.  depth[0] carries the stack height
+    between calls (-1 before the first one).
+    Returns SOLVED, EXHAUSTED, or PAUSED (budget spent, call again).
+    """
+    full = (1 << n) - 1
+    d    = depth[0]
+    if d < 0:
+        cell, avail = _select(grid, row_mask, col_mask, box_mask, box_of, stamp, n, full)
+        if cell < 0:
+            return 1
+        if avail == 0:
+            return 0
+        d = 0
+        stack_cell[0] = cell
+        stack_rem[0]  = avail
+
+    while d >= 0:
+        if budget == 0:
+            depth[0] = d
+            return 2
+        budget -= 1
+
+        i = stack_cell[d]
+        r, c, b = i // n, i % n, box_of[i]
+
+        # undo the value this frame tried last time round
+        if grid[i] != 0:
+            bit = 1 << (grid[i] - 1)
+            row_mask[r] ^= bit
+            col_mask[c] ^= bit
+            box_mask[b] ^= bit
+            grid[i] = 0
+            _stamp_peers(grid, row_mask, col_mask, box_mask, box_of, stamp, tick, n, box, i, bit)
+
+        rem = stack_rem[d]
+        if rem == 0:
+            stamp[i] = tick[0]
+            tick[0] += 1
+            d -= 1
+            continue
+
+        bit = rem & -rem
+        stack_rem[d] = rem ^ bit
+        v, t = 1, bit
+        while t > 1:
+            t >>= 1
+            v += 1
+        _stamp_peers(grid, row_mask, col_mask, box_mask, box_of, stamp, tick, n, box, i, bit)
+        grid[i] = v
+        row_mask[r] |= bit
+        col_mask[c] |= bit
+        box_mask[b] |= bit
+
+        nxt, avail = _select(grid, row_mask, col_mask, box_mask, box_of, stamp, n, full)
+        if nxt < 0:
+            depth[0] = d
+            return 1
+        if avail == 0:
+            continue
+        d += 1
+        stack_cell[d] = nxt
+        stack_rem[d]  = avail
+
+    depth[0] = d
+    return 0
+
+
+def _box_of(n, box):
+    return np.array([(r // box) * box + c // box for r in range(n) for c in range(n)],
+                    np.int64)
+
+
+def solve(grid, row_mask, col_mask, box_mask, n, box):
+    """Drop-in for solve_iterative: fills `grid` (flat bytearray) in place."""
+    flat = np.frombuffer(grid, dtype=np.uint8).astype(np.int64)
+    rm   = np.array(row_mask, dtype=np.int64)
+    cm   = np.array(col_mask, dtype=np.int64)
+    bm   = np.array(box_mask, dtype=np.int64)
+
+    stamp      = np.arange(n * n, dtype=np.int64)   # empty cells enter in index order
+    tick       = np.full(1, n * n, np.int64)
+    stack_cell = np.zeros(n * n, np.int64)
+    stack_rem  = np.zeros(n * n, np.int64)
+    depth      = np.full(1, -1, np.int64)
+    box_of     = _box_of(n, box)
+
+    status = PAUSED
+    while status == PAUSED:
+        status = _search(flat, rm, cm, bm, box_of, stamp, tick,
+                         stack_cell, stack_rem, depth, n, box, SLICE_NODES)
+
+    if status != SOLVED:
+        return False
+    grid[:] = flat.astype(np.uint8).tobytes()
+    return True
+
+
+_warm = False
+
+def warm_up():
+    """Compile (or load from cache) the kernel once, outside any timed region."""
+    global _warm
+    if not _warm:
+        solve(bytearray(16), [0] * 4, [0] * 4, [0] * 4, 4, 2)
+        _warm = True
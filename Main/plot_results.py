@@ -10,13 +10,21 @@ Usage:
     python plot_results.py                              # auto-finds CSV
     python plot_results.py --csv path/to/results.csv
     python plot_results.py --csv results.csv --out ./plots/
+    python plot_results.py --force                      # redraw unchanged charts too
+    python plot_results.py --fmt svg                    # vector output, no rasterising
+
+Each PNG gets a <name>.png.sha digest of the data it was drawn from;
+charts whose digest still matches are not redrawn.
 """
 
-import os, sys, csv, math, argparse
+import os, sys, csv, glob, hashlib, argparse
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 import matplotlib
 matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
+from matplotlib import font_manager
 import numpy as np
 
 # ── colours & style ────────────────────────────────────────────
@@ -25,6 +33,11 @@ C_BT      = "#DD8452"   # orange
 C_TIMEOUT = "#CC3333"   # red  (hatched)
 TIMEOUT_LABEL = ">10 min"
 
+DEFAULT_DPI  = 160
+DEFAULT_SAVE = {"dpi": DEFAULT_DPI}
+FAST_PNG     = {"pil_kwargs": {"compress_level": 1, "optimize": False}}
+FORMATS      = {"png": ("png",), "svg": ("svg",), "both": ("png", "svg")}
+
 plt.rcParams.update({
     "font.family":       "DejaVu Sans",
     "axes.spines.top":   False,
@@ -33,7 +46,12 @@ plt.rcParams.update({
     "figure.facecolor":  "#FFFFFF",
     "grid.color":        "#DDDDDD",
     "grid.linewidth":    0.8,
+    "svg.hashsalt":      "plot_results",
+    "path.simplify":     True,
+    "agg.path.chunksize": 10000,
 })
+# resolve the font once here instead of on each figure's first draw
+font_manager.findfont(font_manager.FontProperties(family="DejaVu Sans"))
 
 # ── group display order & titles ───────────────────────────────
 GROUP_ORDER  = ["4x4", "17-clue", "5-clue", "16x16", "25x25", "36x36"]
@@ -58,48 +76,106 @@ GROUP_SHORT = {
 # ══════════════════════════════════════════════════════════════
 # Load CSV
 # ══════════════════════════════════════════════════════════════
+# the columns the charts read; the rest of the CSV is never loaded
+PLOT_COLUMNS = ["group", "size", "puzzle", "cnf_vars", "cnf_clauses",
+                "sat_time", "bt_time"]
+CHUNK_ROWS   = 100_000
+
 def load_csv(path):
+    """
+    Rows as dicts of PLOT_COLUMNS; parsed by pandas' C reader when pandas
+    is installed, CHUNK_ROWS at a time. The parsed table is cached in
+    <csv>.feather (needs pyarrow) and reused while the CSV is unchanged.
+    """
+    try:
+        import pandas as pd
+    except ImportError:
+        return _load_csv_rows(path)
+
+    cache, key = path + ".feather", _csv_key(path)
+    try:
+        with open(cache + ".meta") as f:
+            if f.read().strip() == key:
+                return pd.read_feather(cache).to_dict("records")
+    except (OSError, ImportError, ValueError):
+        pass
+
+    text   = ["group", "puzzle"]
+    frames = []
+    with pd.read_csv(path, encoding="utf-8-sig", skipinitialspace=True,
+                     usecols=lambda c: c.strip() in PLOT_COLUMNS,
+                     dtype=dict.fromkeys(text, str), keep_default_na=False,
+                     na_values=["", "nan", "NaN"], float_precision="round_trip",
+                     chunksize=CHUNK_ROWS) as chunks:
+        for df in chunks:
+            df.columns = df.columns.str.strip()
+            df = df.reindex(columns=PLOT_COLUMNS)
+            for col in text:
+                df[col] = df[col].fillna("").str.strip()
+            # "inf" / "Infinity" parse to inf; blanks, "nan" and junk become NaN
+            for col in ("sat_time", "bt_time"):
+                df[col] = pd.to_numeric(df[col], errors="coerce")
+            for col in ("size", "cnf_vars", "cnf_clauses"):
+                df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).astype(np.int64)
+            frames.append(df)
+    df = pd.concat(frames, ignore_index=True)
+
+    try:
+        df.to_feather(cache)
+        with open(cache + ".meta", "w") as f:
+            f.write(key + "\n")
+    except (OSError, ImportError):
+        pass
+    return df.to_dict("records")
+
+
+def _csv_key(path):
+    """Identifies this version of the CSV (and of the parsing code)."""
+    st = os.stat(path)
+    return f"{st.st_mtime_ns} {st.st_size} {_CODE_DIGEST.hex()}"
+
+
+def _parse_float(v):
+    # float() itself takes "inf", "Infinity", "nan", ...; blanks and junk -> nan
+    try: return float(v)
+    except ValueError: return float("nan")
+
+
+def _parse_int(v):
+    try: return int(v)
+    except ValueError: return 0
+
+
+def _load_csv_rows(path):
     rows = []
     with open(path, newline="", encoding="utf-8-sig") as f:
-        for raw in csv.DictReader(f):
-            row = {k.strip(): v.strip() for k, v in raw.items()}
-
-            def parse_float(col):
-                v = row.get(col, "nan").strip()
-                if v in ("inf", "Infinity", "infinity"): return float("inf")
-                if v in ("", "nan", "NaN"): return float("nan")
-                try: return float(v)
-                except: return float("nan")
+        reader = csv.reader(f)
+        idx    = {h.strip(): i for i, h in enumerate(next(reader, []))}
 
-            def parse_int(col):
-                v = row.get(col, "0").strip()
-                try: return int(v)
-                except: return 0
+        def field(rec, col, default):
+            i = idx.get(col)
+            return rec[i].strip() if i is not None and i < len(rec) else default
 
+        for rec in reader:
+            if not rec:
+                continue
             rows.append({
-                "group":       row.get("group", ""),
-                "size":        int(row.get("size", 0)),
-                "puzzle":      row.get("puzzle", ""),
-                "cnf_vars":    parse_int("cnf_vars"),
-                "cnf_clauses": parse_int("cnf_clauses"),
-                "enc_time":    parse_float("enc_time"),
-                "sat_time":    parse_float("sat_time"),
-                "bt_time":     parse_float("bt_time"),
-                "sat_status":  row.get("sat_status", ""),
-                "bt_status":   row.get("bt_status", ""),
+                "group":       field(rec, "group", ""),
+                "size":        int(field(rec, "size", 0)),
+                "puzzle":      field(rec, "puzzle", ""),
+                "cnf_vars":    _parse_int(field(rec, "cnf_vars", "0")),
+                "cnf_clauses": _parse_int(field(rec, "cnf_clauses", "0")),
+                "sat_time":    _parse_float(field(rec, "sat_time", "nan")),
+                "bt_time":     _parse_float(field(rec, "bt_time", "nan")),
             })
     return rows
 
 
-
-def is_timeout(v): return math.isinf(v)
-def is_valid(v):   return not math.isnan(v) and not math.isinf(v)
-
-
 # ══════════════════════════════════════════════════════════════
 # Shared helpers
 # ══════════════════════════════════════════════════════════════
 
+@lru_cache(maxsize=4096)
 def puzzle_num(name):
     """Extract trailing number from puzzle name for x-axis label."""
     parts = name.replace("-", "_").split("_")
@@ -109,23 +185,146 @@ def puzzle_num(name):
     return name
 
 
+def times(rows, col):
+    """One time column as a float array (inf = timeout, nan = missing)."""
+    return np.array([r[col] for r in rows], dtype=float)
+
+
+def finite(*arrays):
+    """The finite values of all `arrays`, as one array."""
+    v = np.concatenate(arrays)
+    return v[np.isfinite(v)]
+
+
+def finite_times(rows):
+    """All finite SAT and BT times of `rows`, as one array."""
+    return finite(times(rows, "sat_time"), times(rows, "bt_time"))
+
+
+def group_by(rows, key):
+    """key value -> list of rows, in first-seen order."""
+    out = {}
+    for r in rows:
+        out.setdefault(r[key], []).append(r)
+    return out
+
+
+def mean_or_timeout(a):
+    """nan if no data, inf if any timeout, else the mean."""
+    a = a[~np.isnan(a)]
+    if not a.size:        return float("nan")
+    if np.isinf(a).any(): return float("inf")
+    return float(a.mean())
+
+
+def group_means(groups):
+    """
+    GROUP_ORDER group -> (mean SAT time, mean BT time), via mean_or_timeout;
+    groups with no SAT or BT data at all are left out.
+    """
+    means = {}
+    for g in GROUP_ORDER:
+        if g not in groups:
+            continue
+        sat, bt = times(groups[g], "sat_time"), times(groups[g], "bt_time")
+        if not (np.isnan(sat).all() and np.isnan(bt).all()):
+            means[g] = (mean_or_timeout(sat), mean_or_timeout(bt))
+    return means
+
+
 def timeout_bar_height(all_rows):
     """Height to draw timeout bars: 3× the largest finite solve time."""
-    finite = [v for r in all_rows
-              for v in (r["sat_time"], r["bt_time"]) if is_valid(v)]
-    return max(finite) * 3 if finite else 600.0
+    finite = finite_times(all_rows)
+    return float(finite.max()) * 3 if finite.size else 600.0
 
 
-def add_bar(ax, x, height, width, color, timeout=False, label_val=None):
-    """Draw one bar, hatched if timeout."""
-    hatch = "//" if timeout else None
-    alpha = 0.70 if timeout else 0.88
-    ax.bar(x, height, width, color=color, alpha=alpha,
-           hatch=hatch, edgecolor="white", linewidth=0.6, zorder=3)
-    if timeout:
-        ax.text(x, height * 1.04, TIMEOUT_LABEL,
-                ha="center", va="bottom", fontsize=7.5,
-                color=C_TIMEOUT, fontweight="bold")
+_figures = {}
+
+def get_figure(figsize):
+    """
+    (fig, ax) for this figure size, reused across calls in this process:
+    the axes come back cleared instead of building a new Figure each time.
+    """
+    if figsize not in _figures:
+        _figures[figsize] = plt.subplots(figsize=figsize, layout="constrained")
+    fig, ax = _figures[figsize]
+    ax.clear()
+    return fig, ax
+
+
+with open(__file__, "rb") as _f:
+    _CODE_DIGEST = hashlib.blake2b(_f.read(), digest_size=16).digest()
+
+def row_digest(rows, *extra):
+    """
+    Digest of everything a chart is drawn from: its rows, any extra
+    arguments (timeout bar height, save options) and this script itself.
+    """
+    h = hashlib.blake2b(_CODE_DIGEST, digest_size=16)
+    h.update(repr(extra).encode())
+    for r in rows:
+        h.update(f"{r['group']}|{r['size']}|{r['puzzle']}|{r['sat_time']}|"
+                 f"{r['bt_time']}|{r['cnf_vars']}|{r['cnf_clauses']}\n".encode())
+    return h.hexdigest()
+
+
+def outputs(fname, save_kw=None):
+    """The files save() writes for fname (a .png path): one per format."""
+    base = os.path.splitext(fname)[0]
+    return [f"{base}.{ext}"
+            for ext in (save_kw or DEFAULT_SAVE).get("formats", ("png",))]
+
+
+def up_to_date(fname, digest, save_kw=None):
+    """True if fname's outputs exist and were last saved from the same digest."""
+    try:
+        with open(fname + ".sha") as f:
+            if f.read().strip() != digest:
+                return False
+    except OSError:
+        return False
+    return all(os.path.exists(p) for p in outputs(fname, save_kw))
+
+
+def save(fig, fname, save_kw=None, digest=None):
+    """
+    savefig in each of the run's formats, with its DPI / PNG options
+    (DEFAULT_SAVE if none); with a digest, also record it in <fname>.sha
+    for up_to_date(). Returns the first file written.
+    """
+    kw = dict(save_kw or DEFAULT_SAVE)
+    kw.pop("formats", None)
+    paths = outputs(fname, save_kw)
+    for path in paths:
+        if path.endswith(".svg"):
+            # vector output: no rasterising, and no date so reruns match
+            fig.savefig(path, metadata={"Date": None})
+        else:
+            fig.savefig(path, **kw)
+    if digest:
+        with open(fname + ".sha", "w") as f:
+            f.write(digest + "\n")
+    return paths[0]
+
+
+def add_bars(ax, xs, values, width, color, tb_h):
+    """
+    Draw one series of bars with two ax.bar calls: the solved bars, then
+    the timeouts as hatched bars of height tb_h. NaN values get no bar.
+    """
+    v  = np.asarray(values, dtype=float)
+    ok = np.isfinite(v)
+    to = np.isinf(v)
+    if ok.any():
+        ax.bar(xs[ok], v[ok], width, color=color, alpha=0.88,
+               edgecolor="white", linewidth=0.6, zorder=3)
+    if to.any():
+        ax.bar(xs[to], tb_h, width, color=C_TIMEOUT, alpha=0.70,
+               hatch="//", edgecolor="white", linewidth=0.6, zorder=3)
+        for xi in xs[to]:
+            ax.text(xi, tb_h * 1.04, TIMEOUT_LABEL,
+                    ha="center", va="bottom", fontsize=7.5,
+                    color=C_TIMEOUT, fontweight="bold")
 
 
 def standard_legend(ax, has_sat=True, has_timeout=False):
@@ -142,48 +341,41 @@ def standard_legend(ax, has_sat=True, has_timeout=False):
 
 def use_log(group_rows):
     """Use log scale if max/min ratio > 50."""
-    vals = [v for r in group_rows
-            for v in (r["sat_time"], r["bt_time"]) if is_valid(v)]
-    if len(vals) < 2: return False
-    return max(vals) / max(min(vals), 1e-12) > 50
+    vals = finite_times(group_rows)
+    if vals.size < 2: return False
+    return vals.max() / max(vals.min(), 1e-12) > 50
 
 
 # ══════════════════════════════════════════════════════════════
 # Plot 1 – per-group bar chart
 # ══════════════════════════════════════════════════════════════
 
-def plot_group(group, rows, out_dir, tb_h):
+def plot_group(group, rows, out_dir, tb_h, save_kw=None):
     n      = len(rows)
     x      = np.arange(n)
     w      = 0.32
     title  = GROUP_TITLES.get(group, group)
     labels = [puzzle_num(r["puzzle"]) for r in rows]
 
-    sat_times = [r["sat_time"] for r in rows]
-    bt_times  = [r["bt_time"]  for r in rows]
-    has_sat   = any(is_valid(v) for v in sat_times)
-    any_to    = any(is_timeout(v) for v in sat_times + bt_times)
+    sat_times = times(rows, "sat_time")
+    bt_times  = times(rows, "bt_time")
+    has_sat   = np.isfinite(sat_times).any()
+    any_to    = np.isinf(sat_times).any() or np.isinf(bt_times).any()
 
     log = use_log(rows)
 
-    fig, ax = plt.subplots(figsize=(max(7, n * 1.6 + 1.5), 5.5))
-    ax.set_title(title, fontsize=14, fontweight="bold", pad=14)
-
-    for i in range(n):
-        sv, bv = sat_times[i], bt_times[i]
+    safe   = group.replace("/", "_").replace(" ", "_")
+    fname  = os.path.join(out_dir, f"plot_{safe}.png")
+    digest = row_digest(rows, tb_h, save_kw)
+    if up_to_date(fname, digest, save_kw):
+        return fname
 
-        # SAT bar
-        if has_sat:
-            if is_timeout(sv):
-                add_bar(ax, x[i] - w/2, tb_h, w, C_TIMEOUT, timeout=True)
-            elif is_valid(sv):
-                add_bar(ax, x[i] - w/2, sv, w, C_SAT, label_val=sv)
+    fig, ax = get_figure((max(7, n * 1.6 + 1.5), 5.5))
+    ax.set_title(title, fontsize=14, fontweight="bold", pad=14)
 
-        # Backtracking bar
-        if is_timeout(bv):
-            add_bar(ax, x[i] + w/2, tb_h, w, C_TIMEOUT, timeout=True)
-        elif is_valid(bv):
-            add_bar(ax, x[i] + w/2, bv, w, C_BT, label_val=bv)
+    if has_sat:
+        add_bars(ax, x - w/2, sat_times, w, C_SAT, tb_h)
+    add_bars(ax, x + w/2, bt_times, w, C_BT, tb_h)
 
     ax.set_xticks(x)
     ax.set_xticklabels(labels, fontsize=11)
@@ -194,19 +386,14 @@ def plot_group(group, rows, out_dir, tb_h):
 
     if log:
         ax.set_yscale("log")
-        finite = [v for v in sat_times + bt_times if is_valid(v)]
-        ax.set_ylim(bottom=min(finite) * 0.3 if finite else 1e-5)
+        f = finite(sat_times, bt_times)
+        ax.set_ylim(bottom=f.min() * 0.3 if f.size else 1e-5)
     else:
         ax.set_ylim(bottom=0)
 
     standard_legend(ax, has_sat=has_sat, has_timeout=any_to)
-    plt.tight_layout()
 
-    safe  = group.replace("/", "_").replace(" ", "_")
-    fname = os.path.join(out_dir, f"plot_{safe}.png")
-    plt.savefig(fname, dpi=160, bbox_inches="tight")
-    plt.close()
-    return fname
+    return save(fig, fname, save_kw, digest)
 
 
 
@@ -214,7 +401,7 @@ def plot_group(group, rows, out_dir, tb_h):
 # Plot 1b – per-group LINE chart (SAT vs BT across puzzles)
 # ══════════════════════════════════════════════════════════════
 
-def plot_group_line(group, rows, out_dir, tb_h):
+def plot_group_line(group, rows, out_dir, tb_h, save_kw=None):
     """
     Line graph for a single puzzle group: x = puzzle index,
     y = solve time (log scale). One line per solver.
@@ -223,37 +410,37 @@ def plot_group_line(group, rows, out_dir, tb_h):
     title  = GROUP_TITLES.get(group, group)
     labels = [puzzle_num(r["puzzle"]) for r in rows]
     n      = len(rows)
-    xs     = list(range(1, n + 1))   # 1-indexed for cleaner display
+    xs     = np.arange(1, n + 1)     # 1-indexed for cleaner display
+
+    sat_times = times(rows, "sat_time")
+    bt_times  = times(rows, "bt_time")
+    has_sat   = not np.isnan(sat_times).all()
 
-    sat_times = [r["sat_time"] for r in rows]
-    bt_times  = [r["bt_time"]  for r in rows]
-    has_sat   = any(is_valid(v) or is_timeout(v) for v in sat_times)
+    safe   = group.replace("/", "_").replace(" ", "_")
+    fname  = os.path.join(out_dir, f"line_{safe}.png")
+    digest = row_digest(rows, tb_h, save_kw)
+    if up_to_date(fname, digest, save_kw):
+        return fname
 
-    fig, ax = plt.subplots(figsize=(max(7, n * 1.4 + 2), 5.5))
+    fig, ax = get_figure((max(7, n * 1.4 + 2), 5.5))
     ax.set_title(title + " — Line Chart", fontsize=14, fontweight="bold", pad=14)
 
-    def draw_line(times, color, label, marker):
-        good_x, good_y = [], []
-        to_x           = []
-        for xi, v in zip(xs, times):
-            if is_valid(v):
-                good_x.append(xi); good_y.append(v)
-            elif is_timeout(v):
-                to_x.append(xi)
-
-        if good_x:
-            ax.plot(good_x, good_y, marker + "-", color=color,
+    def draw_line(vals, color, label, marker):
+        ok   = np.isfinite(vals)
+        to_x = xs[np.isinf(vals)]
+
+        if ok.any():
+            ax.plot(xs[ok], vals[ok], marker + "-", color=color,
                     lw=2.2, ms=9, label=label, zorder=4)
-        if to_x:
+        if to_x.size:
             ax.plot(to_x, [tb_h] * len(to_x), "v",
                     color=C_TIMEOUT, ms=14, zorder=5,
                     label=f"{label} — {TIMEOUT_LABEL}")
+            # plain Text: an arrowless Annotation draws the same, at more cost
             for xi in to_x:
-                ax.annotate(TIMEOUT_LABEL,
-                            xy=(xi, tb_h),
-                            xytext=(xi, tb_h * 1.15),
-                            ha="center", fontsize=8,
-                            color=C_TIMEOUT, fontweight="bold")
+                ax.text(xi, tb_h * 1.15, TIMEOUT_LABEL,
+                        ha="center", fontsize=8,
+                        color=C_TIMEOUT, fontweight="bold")
 
     if has_sat:
         draw_line(sat_times, C_SAT, "SAT Solver (satch)", "o")
@@ -265,121 +452,88 @@ def plot_group_line(group, rows, out_dir, tb_h):
     ax.set_ylabel("Solve Time (seconds — log scale)", fontsize=12)
     ax.set_yscale("log")
 
-    all_finite = [v for v in sat_times + bt_times if is_valid(v)]
-    if all_finite:
-        ax.set_ylim(bottom=min(all_finite) * 0.3)
+    all_finite = finite(sat_times, bt_times)
+    if all_finite.size:
+        ax.set_ylim(bottom=all_finite.min() * 0.3)
 
     ax.grid(True, which="both", linestyle="--", alpha=0.5, zorder=0)
     ax.legend(fontsize=9, loc="upper right", framealpha=0.9, edgecolor="#cccccc")
-    plt.tight_layout()
 
-    safe  = group.replace("/", "_").replace(" ", "_")
-    fname = os.path.join(out_dir, f"line_{safe}.png")
-    plt.savefig(fname, dpi=160, bbox_inches="tight")
-    plt.close()
-    return fname
+    return save(fig, fname, save_kw, digest)
 
 
 # ══════════════════════════════════════════════════════════════
 # Plot 2 – overview (mean per group, all groups side-by-side)
 # ══════════════════════════════════════════════════════════════
 
-def plot_overview(all_rows, out_dir, tb_h):
-    from collections import defaultdict
-    agg = defaultdict(lambda: {"sat": [], "bt": []})
-    for r in all_rows:
-        g = r["group"]
-        if is_valid(r["sat_time"]):    agg[g]["sat"].append(r["sat_time"])
-        elif is_timeout(r["sat_time"]): agg[g]["sat"].append(tb_h)
-        if is_valid(r["bt_time"]):     agg[g]["bt"].append(r["bt_time"])
-        elif is_timeout(r["bt_time"]): agg[g]["bt"].append(tb_h)
-
-    def mean_or_timeout(lst):
-        if not lst: return float("nan")
-        if tb_h in lst: return float("inf")   # any timeout → timeout
-        return sum(lst) / len(lst)
-
-    groups  = [g for g in GROUP_ORDER if g in agg]
+def plot_overview(all_rows, out_dir, tb_h, means=None, save_kw=None):
+    means = means if means is not None else group_means(group_by(all_rows, "group"))
+
+    groups  = list(means)
     xlabels = [GROUP_SHORT.get(g, g) for g in groups]
     x       = np.arange(len(groups))
     w       = 0.32
 
-    sat_m = [mean_or_timeout(agg[g]["sat"]) for g in groups]
-    bt_m  = [mean_or_timeout(agg[g]["bt"])  for g in groups]
-    has_sat = any(is_valid(v) or is_timeout(v) for v in sat_m)
-    any_to  = any(is_timeout(v) for v in sat_m + bt_m)
+    sat_m = np.array([means[g][0] for g in groups])
+    bt_m  = np.array([means[g][1] for g in groups])
+    has_sat = not np.isnan(sat_m).all()
+    any_to  = np.isinf(sat_m).any() or np.isinf(bt_m).any()
+
+    fname  = os.path.join(out_dir, "plot_overview.png")
+    digest = row_digest(all_rows, tb_h, save_kw)
+    if up_to_date(fname, digest, save_kw):
+        return fname
 
-    fig, ax = plt.subplots(figsize=(max(9, len(groups) * 1.6 + 1.5), 5.5))
+    fig, ax = get_figure((max(9, len(groups) * 1.6 + 1.5), 5.5))
     ax.set_title("Benchmark Overview: SAT vs Backtracking (mean per type)",
                  fontsize=14, fontweight="bold", pad=14)
 
-    for i in range(len(groups)):
-        sv, bv = sat_m[i], bt_m[i]
-        if has_sat:
-            if is_timeout(sv):
-                add_bar(ax, x[i] - w/2, tb_h, w, C_TIMEOUT, timeout=True)
-            elif is_valid(sv):
-                add_bar(ax, x[i] - w/2, sv, w, C_SAT, label_val=sv)
-        if is_timeout(bv):
-            add_bar(ax, x[i] + w/2, tb_h, w, C_TIMEOUT, timeout=True)
-        elif is_valid(bv):
-            add_bar(ax, x[i] + w/2, bv, w, C_BT, label_val=bv)
+    if has_sat:
+        add_bars(ax, x - w/2, sat_m, w, C_SAT, tb_h)
+    add_bars(ax, x + w/2, bt_m, w, C_BT, tb_h)
 
     ax.set_xticks(x)
     ax.set_xticklabels(xlabels, fontsize=11)
     ax.set_xlabel("Puzzle Type", fontsize=12)
     ax.set_ylabel("Mean Solve Time (seconds — log scale)", fontsize=12)
     ax.set_yscale("log")
-    finite = [v for v in sat_m + bt_m if is_valid(v)]
-    ax.set_ylim(bottom=min(finite) * 0.2 if finite else 1e-5)
+    f = finite(sat_m, bt_m)
+    ax.set_ylim(bottom=f.min() * 0.2 if f.size else 1e-5)
     ax.grid(axis="y", which="both", zorder=0)
     standard_legend(ax, has_sat=has_sat, has_timeout=any_to)
-    plt.tight_layout()
 
-    fname = os.path.join(out_dir, "plot_overview.png")
-    plt.savefig(fname, dpi=160, bbox_inches="tight")
-    plt.close()
-    return fname
+    return save(fig, fname, save_kw, digest)
 
 
 # ══════════════════════════════════════════════════════════════
 # Plot 3 – scaling line chart
 # ══════════════════════════════════════════════════════════════
 
-def plot_scaling(all_rows, out_dir, tb_h):
-    from collections import defaultdict
-    agg = defaultdict(lambda: {"sat": [], "bt": []})
-    for r in all_rows:
-        g = r["group"]
-        if is_valid(r["sat_time"]):     agg[g]["sat"].append(r["sat_time"])
-        elif is_timeout(r["sat_time"]): agg[g]["sat"].append(float("inf"))
-        if is_valid(r["bt_time"]):      agg[g]["bt"].append(r["bt_time"])
-        elif is_timeout(r["bt_time"]):  agg[g]["bt"].append(float("inf"))
-
-    def mean_or_inf(lst):
-        if not lst: return float("nan")
-        if float("inf") in lst: return float("inf")
-        return sum(lst) / len(lst)
-
-    groups  = [g for g in GROUP_ORDER if g in agg]
-    xlabels = [GROUP_SHORT.get(g, g).replace("\n", " ") for g in groups]
-    sat_m   = [mean_or_inf(agg[g]["sat"]) for g in groups]
-    bt_m    = [mean_or_inf(agg[g]["bt"])  for g in groups]
-    has_sat = any(is_valid(v) or is_timeout(v) for v in sat_m)
-
-    fig, ax = plt.subplots(figsize=(max(9, len(groups) * 1.5 + 1.5), 5.5))
+def plot_scaling(all_rows, out_dir, tb_h, means=None, save_kw=None):
+    means = means if means is not None else group_means(group_by(all_rows, "group"))
+
+    groups  = list(means)
+    xlabels = np.array([GROUP_SHORT.get(g, g).replace("\n", " ") for g in groups])
+    sat_m   = np.array([means[g][0] for g in groups])
+    bt_m    = np.array([means[g][1] for g in groups])
+    has_sat = not np.isnan(sat_m).all()
+
+    fname  = os.path.join(out_dir, "plot_scaling.png")
+    digest = row_digest(all_rows, tb_h, save_kw)
+    if up_to_date(fname, digest, save_kw):
+        return fname
+
+    fig, ax = get_figure((max(9, len(groups) * 1.5 + 1.5), 5.5))
     ax.set_title("Solve Time Scaling Across Puzzle Types",
                  fontsize=14, fontweight="bold", pad=14)
 
     def draw_line(means, color, label, marker):
-        xs_good, ys_good, xs_to = [], [], []
-        for xl, v in zip(xlabels, means):
-            if is_valid(v):        xs_good.append(xl); ys_good.append(v)
-            elif is_timeout(v):    xs_to.append(xl)
-        if xs_good:
-            ax.plot(xs_good, ys_good, marker + "-", color=color,
+        ok    = np.isfinite(means)
+        xs_to = xlabels[np.isinf(means)]
+        if ok.any():
+            ax.plot(xlabels[ok], means[ok], marker + "-", color=color,
                     lw=2.2, ms=9, label=label, zorder=4)
-        if xs_to:
+        if xs_to.size:
             ax.plot(xs_to, [tb_h] * len(xs_to), "v",
                     color=C_TIMEOUT, ms=14, zorder=5,
                     label=f"{label} — {TIMEOUT_LABEL}")
@@ -391,16 +545,12 @@ def plot_scaling(all_rows, out_dir, tb_h):
     ax.set_xlabel("Puzzle Type", fontsize=12)
     ax.set_ylabel("Mean Solve Time (seconds — log scale)", fontsize=12)
     ax.set_yscale("log")
-    finite = [v for v in sat_m + bt_m if is_valid(v)]
-    ax.set_ylim(bottom=min(finite) * 0.2 if finite else 1e-5)
+    f = finite(sat_m, bt_m)
+    ax.set_ylim(bottom=f.min() * 0.2 if f.size else 1e-5)
     ax.grid(True, which="both", zorder=0)
     ax.legend(fontsize=9, loc="upper left", framealpha=0.9, edgecolor="#cccccc")
-    plt.tight_layout()
 
-    fname = os.path.join(out_dir, "plot_scaling.png")
-    plt.savefig(fname, dpi=160, bbox_inches="tight")
-    plt.close()
-    return fname
+    return save(fig, fname, save_kw, digest)
 
 
 
@@ -408,103 +558,83 @@ def plot_scaling(all_rows, out_dir, tb_h):
 # Plot 4 – direct comparison: average per grid size
 # ══════════════════════════════════════════════════════════════
 
-def plot_size_comparison(all_rows, out_dir, tb_h):
+def plot_size_comparison(all_rows, out_dir, tb_h, by_size=None, save_kw=None):
     """
     Groups ALL puzzles by grid SIZE (4, 9, 16, 25, 36),
     averages SAT and BT times, and plots side-by-side.
     If ANY puzzle in a size group timed out -> shows >10 min bar.
     """
-    from collections import defaultdict
-    size_data = defaultdict(lambda: {"sat": [], "bt": []})
-    for r in all_rows:
-        size_data[r["size"]]["sat"].append(r["sat_time"])
-        size_data[r["size"]]["bt"].append(r["bt_time"])
-
-    sizes = sorted(size_data.keys())
+    by_size = by_size if by_size is not None else group_by(all_rows, "size")
+    sizes   = sorted(by_size)
 
-    def avg(lst):
-        if any(is_timeout(v) for v in lst): return float("inf")
-        finite = [v for v in lst if is_valid(v)]
-        return sum(finite) / len(finite) if finite else float("nan")
-
-    sat_avgs = [avg(size_data[s]["sat"]) for s in sizes]
-    bt_avgs  = [avg(size_data[s]["bt"])  for s in sizes]
-    counts   = [len(size_data[s]["sat"]) for s in sizes]
-    has_sat  = any(is_valid(v) or is_timeout(v) for v in sat_avgs)
-    any_to   = any(is_timeout(v) for v in sat_avgs + bt_avgs)
+    sat_avgs = np.array([mean_or_timeout(times(by_size[s], "sat_time")) for s in sizes])
+    bt_avgs  = np.array([mean_or_timeout(times(by_size[s], "bt_time"))  for s in sizes])
+    counts   = [len(by_size[s]) for s in sizes]
+    has_sat  = not np.isnan(sat_avgs).all()
+    any_to   = np.isinf(sat_avgs).any() or np.isinf(bt_avgs).any()
 
     x       = np.arange(len(sizes))
     w       = 0.32
     xlabels = [f"{s}\u00d7{s}\n(n={counts[i]})" for i, s in enumerate(sizes)]
 
-    fig, ax = plt.subplots(figsize=(max(9, len(sizes) * 1.8 + 2), 6))
+    fname  = os.path.join(out_dir, "plot_by_grid_size.png")
+    digest = row_digest(all_rows, tb_h, save_kw)
+    if up_to_date(fname, digest, save_kw):
+        return fname
+
+    fig, ax = get_figure((max(9, len(sizes) * 1.8 + 2), 6))
     ax.set_title(
         "SAT vs Backtracking — Average Solve Time by Grid Size",
         fontsize=14, fontweight="bold", pad=14
     )
 
-    for i in range(len(sizes)):
-        sv, bv = sat_avgs[i], bt_avgs[i]
-        if has_sat:
-            if is_timeout(sv):
-                add_bar(ax, x[i] - w/2, tb_h, w, C_TIMEOUT, timeout=True)
-            elif is_valid(sv):
-                add_bar(ax, x[i] - w/2, sv, w, C_SAT, label_val=sv)
-        if is_timeout(bv):
-            add_bar(ax, x[i] + w/2, tb_h, w, C_TIMEOUT, timeout=True)
-        elif is_valid(bv):
-            add_bar(ax, x[i] + w/2, bv, w, C_BT, label_val=bv)
+    if has_sat:
+        add_bars(ax, x - w/2, sat_avgs, w, C_SAT, tb_h)
+    add_bars(ax, x + w/2, bt_avgs, w, C_BT, tb_h)
 
     ax.set_xticks(x)
     ax.set_xticklabels(xlabels, fontsize=11)
     ax.set_xlabel("Grid Size  (n = number of puzzles averaged)", fontsize=12)
     ax.set_ylabel("Average Solve Time (seconds — log scale)", fontsize=12)
     ax.set_yscale("log")
-    finite = [v for v in sat_avgs + bt_avgs if is_valid(v)]
-    ax.set_ylim(bottom=min(finite) * 0.2 if finite else 1e-5)
+    f = finite(sat_avgs, bt_avgs)
+    ax.set_ylim(bottom=f.min() * 0.2 if f.size else 1e-5)
     ax.grid(axis="y", which="both", zorder=0)
 
     # Sub-label: which groups are inside each size
     for i, s in enumerate(sizes):
-        grps = sorted({r["group"] for r in all_rows if r["size"] == s})
+        grps = sorted({r["group"] for r in by_size[s]})
         ax.text(x[i], ax.get_ylim()[0] * 0.55, ", ".join(grps),
                 ha="center", va="top", fontsize=7,
                 color="#666666", style="italic")
 
     standard_legend(ax, has_sat=has_sat, has_timeout=any_to)
-    plt.tight_layout()
-    fname = os.path.join(out_dir, "plot_by_grid_size.png")
-    plt.savefig(fname, dpi=160, bbox_inches="tight")
-    plt.close()
-    return fname
+    return save(fig, fname, save_kw, digest)
 
 
 # ══════════════════════════════════════════════════════════════
 # Plot 5 – speedup ratio: BT time / SAT time per grid size
 # ══════════════════════════════════════════════════════════════
 
-def plot_speedup(all_rows, out_dir):
+def plot_speedup(all_rows, out_dir, by_size=None, save_kw=None):
     """
     For each grid size compute speedup = avg_bt / avg_sat.
     Bar > 1: SAT is faster. Bar < 1: BT is faster.
     """
-    from collections import defaultdict
-    size_data = defaultdict(lambda: {"sat": [], "bt": []})
-    for r in all_rows:
-        size_data[r["size"]]["sat"].append(r["sat_time"])
-        size_data[r["size"]]["bt"].append(r["bt_time"])
-
-    sizes = sorted(size_data.keys())
+    by_size = by_size if by_size is not None else group_by(all_rows, "size")
+    sizes   = sorted(by_size)
 
-    def avg_finite(lst):
-        f = [v for v in lst if is_valid(v)]
-        return sum(f) / len(f) if f else None
+    def avg_finite(a):
+        f = finite(a)
+        return float(f.mean()) if f.size else None
 
     speedups, bar_colors, annotations, xlabels = [], [], [], []
     for s in sizes:
-        sat_a    = avg_finite(size_data[s]["sat"])
-        bt_a     = avg_finite(size_data[s]["bt"])
-        bt_to    = any(is_timeout(v) for v in size_data[s]["bt"])
+        sat_t    = times(by_size[s], "sat_time")
+        bt_t     = times(by_size[s], "bt_time")
+        sat_a    = avg_finite(sat_t)
+        bt_a     = avg_finite(bt_t)
+        bt_to    = np.isinf(bt_t).any()
         xlabels.append(f"{s}\u00d7{s}")
 
         if bt_to and sat_a:
@@ -521,7 +651,12 @@ def plot_speedup(all_rows, out_dir):
             bar_colors.append("#aaaaaa")
             annotations.append("N/A")
 
-    fig, ax = plt.subplots(figsize=(max(8, len(sizes) * 1.8 + 2), 5.5))
+    fname  = os.path.join(out_dir, "plot_speedup.png")
+    digest = row_digest(all_rows, save_kw)
+    if up_to_date(fname, digest, save_kw):
+        return fname
+
+    fig, ax = get_figure((max(8, len(sizes) * 1.8 + 2), 5.5))
     ax.set_title(
         "SAT Speedup over Backtracking by Grid Size\n"
         "(value > 1 \u2192 SAT faster;  value < 1 \u2192 Backtracking faster)",
@@ -548,48 +683,44 @@ def plot_speedup(all_rows, out_dir):
     ax.legend(handles=[sat_p, bt_p, eq_l], fontsize=9,
               framealpha=0.9, edgecolor="#cccccc")
 
-    plt.tight_layout()
-    fname = os.path.join(out_dir, "plot_speedup.png")
-    plt.savefig(fname, dpi=160, bbox_inches="tight")
-    plt.close()
-    return fname
+    return save(fig, fname, save_kw, digest)
 # ══════════════════════════════════════════════════════════════
 # Plot 6 – CNF Variables & Clauses per puzzle
 # ══════════════════════════════════════════════════════════════
 
-def plot_cnf_stats(rows, out_dir):
-    from collections import defaultdict
+def plot_cnf_group(g, g_rows, out_dir, save_kw=None):
+    n      = len(g_rows)
+    x      = np.arange(n)
+    w      = 0.35
+    labels = [puzzle_num(r["puzzle"]) for r in g_rows]
 
-    groups = defaultdict(list)
-    for r in rows:
-        groups[r["group"]].append(r)
-
-    for g, g_rows in groups.items():
-        n      = len(g_rows)
-        x      = np.arange(n)
-        w      = 0.35
-        labels = [puzzle_num(r["puzzle"]) for r in g_rows]
-
-        vars_vals    = [r["cnf_vars"] for r in g_rows]
-        clauses_vals = [r["cnf_clauses"] for r in g_rows]
-
-        fig, ax = plt.subplots(figsize=(max(7, n * 1.6), 5))
-        ax.bar(x - w/2, vars_vals, width=w, label="CNF Variables", color="#5DADE2")
-        ax.bar(x + w/2, clauses_vals, width=w, label="CNF Clauses", color="#F5B041")
-
-        ax.set_xticks(x)
-        ax.set_xticklabels(labels, fontsize=11)
-        ax.set_xlabel("Puzzle", fontsize=12)
-        ax.set_ylabel("Count", fontsize=12)
-        ax.set_title(f"CNF Variables & Clauses — {GROUP_TITLES.get(g,g)}", fontsize=14)
-        ax.legend(fontsize=9)
-        ax.grid(axis="y", linestyle="--", alpha=0.5)
-
-        safe  = g.replace("/", "_").replace(" ", "_")
-        fname = os.path.join(out_dir, f"cnf_{safe}.png")
-        plt.tight_layout()
-        plt.savefig(fname, dpi=160, bbox_inches="tight")
-        plt.close()
+    vars_vals    = [r["cnf_vars"] for r in g_rows]
+    clauses_vals = [r["cnf_clauses"] for r in g_rows]
+
+    safe   = g.replace("/", "_").replace(" ", "_")
+    fname  = os.path.join(out_dir, f"cnf_{safe}.png")
+    digest = row_digest(g_rows, save_kw)
+    if up_to_date(fname, digest, save_kw):
+        return fname
+
+    fig, ax = get_figure((max(7, n * 1.6), 5))
+    ax.bar(x - w/2, vars_vals, width=w, label="CNF Variables", color="#5DADE2")
+    ax.bar(x + w/2, clauses_vals, width=w, label="CNF Clauses", color="#F5B041")
+
+    ax.set_xticks(x)
+    ax.set_xticklabels(labels, fontsize=11)
+    ax.set_xlabel("Puzzle", fontsize=12)
+    ax.set_ylabel("Count", fontsize=12)
+    ax.set_title(f"CNF Variables & Clauses — {GROUP_TITLES.get(g,g)}", fontsize=14)
+    ax.legend(fontsize=9)
+    ax.grid(axis="y", linestyle="--", alpha=0.5)
+
+    return save(fig, fname, save_kw, digest)
+
+
+def plot_cnf_stats(rows, out_dir, groups=None, save_kw=None):
+    groups = groups if groups is not None else group_by(rows, "group")
+    return [plot_cnf_group(g, g_rows, out_dir, save_kw) for g, g_rows in groups.items()]
 
 # ══════════════════════════════════════════════════════════════
 # main
@@ -613,6 +744,16 @@ def main():
     )
     parser.add_argument("--csv", default=None, help="Path to CSV file")
     parser.add_argument("--out", default=None, help="Output directory for PNGs")
+    parser.add_argument("--dpi", type=int, default=DEFAULT_DPI,
+                        help=f"PNG resolution (default {DEFAULT_DPI}; e.g. 100 for CI)")
+    parser.add_argument("--fast-png", action="store_true",
+                        help="Light PNG compression: faster to write, larger files")
+    parser.add_argument("--fmt", choices=FORMATS, default="png",
+                        help="Output format; svg skips rasterising (default png)")
+    parser.add_argument("--force", action="store_true",
+                        help="Redraw every chart, even ones whose data is unchanged")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="Processes for the per-group charts (default: all cores)")
     args = parser.parse_args()
 
     csv_path = args.csv or find_csv_auto()
@@ -632,58 +773,60 @@ def main():
     print(f"Timeout bar height: {tb_h:.3f}s\n")
 
     # group rows
-    from collections import defaultdict
-    groups = defaultdict(list)
-    for r in rows:
-        groups[r["group"]].append(r)
+    groups  = group_by(rows, "group")
+    by_size = group_by(rows, "size")
+    means   = group_means(groups)
 
-    saved = []
+    save_kw = {"dpi": args.dpi, **(FAST_PNG if args.fast_png else {}),
+               "formats": FORMATS[args.fmt]}
+    if args.force:
+        for sha in glob.glob(os.path.join(out_dir, "*.png.sha")):
+            os.remove(sha)
 
-    # ── per-group charts (bar + line) ─────────────────────────
-    for g in GROUP_ORDER:
-        if g not in groups:
-            continue
+    saved = []
+    ex    = ProcessPoolExecutor(max_workers=args.jobs)
+
+    # ── per-group charts (bar + line, CNF stats): one job each ──
+    # GROUP_ORDER first, then any group not in it
+    ordered  = ([g for g in GROUP_ORDER if g in groups] +
+                [g for g in groups if g not in GROUP_ORDER])
+    per_group = {g: [ex.submit(fn, g, groups[g], out_dir, tb_h, save_kw)
+                     for fn in (plot_group, plot_group_line)] for g in ordered}
+    cnf_jobs  = [ex.submit(plot_cnf_group, g, g_rows, out_dir, save_kw)
+                 for g, g_rows in groups.items()]
+
+    for g in ordered:
         print(f"  [{g}] {len(groups[g])} puzzles ...")
-        p = plot_group(g, groups[g], out_dir, tb_h)
-        saved.append(p)
-        print(f"    -> {os.path.basename(p)}")
-        p = plot_group_line(g, groups[g], out_dir, tb_h)
-        saved.append(p)
-        print(f"    -> {os.path.basename(p)}")
-
-    # any group not in GROUP_ORDER
-    for g, g_rows in groups.items():
-        if g not in GROUP_ORDER:
-            print(f"  [{g}] {len(g_rows)} puzzles ...")
-            p = plot_group(g, g_rows, out_dir, tb_h)
-            saved.append(p); print(f"    -> {os.path.basename(p)}")
-            p = plot_group_line(g, g_rows, out_dir, tb_h)
+        for job in per_group[g]:
+            p = job.result()
             saved.append(p); print(f"    -> {os.path.basename(p)}")
 
     # ── overview ───────────────────────────────────────────────
     print("\n  [Overview] all types ...")
-    p = plot_overview(rows, out_dir, tb_h)
+    p = plot_overview(rows, out_dir, tb_h, means, save_kw)
     saved.append(p); print(f"    -> {os.path.basename(p)}")
 
     # ── scaling line ───────────────────────────────────────────
     print("\n  [Scaling line chart] ...")
-    p = plot_scaling(rows, out_dir, tb_h)
+    p = plot_scaling(rows, out_dir, tb_h, means, save_kw)
     saved.append(p); print(f"    -> {os.path.basename(p)}")
 
     # ── average by grid size — direct comparison ───────────────
     print("\n  [Average by grid size — direct comparison] ...")
-    p = plot_size_comparison(rows, out_dir, tb_h)
+    p = plot_size_comparison(rows, out_dir, tb_h, by_size, save_kw)
     saved.append(p); print(f"    -> {os.path.basename(p)}")
 
     # ── speedup ratio ───────────────────────────────────────────
     print("\n  [SAT speedup over backtracking] ...")
-    p = plot_speedup(rows, out_dir)
+    p = plot_speedup(rows, out_dir, by_size, save_kw)
     saved.append(p); print(f"    -> {os.path.basename(p)}")
 
     print(f"\n✓ {len(saved)} plots saved to: {out_dir}")
 
     print("\n  [CNF stats per group] ...")
-    p = plot_cnf_stats(rows, out_dir)
+    for job in cnf_jobs:
+        job.result()
+    ex.shutdown()
     print(f"    -> CNF plots saved per group")
 
 
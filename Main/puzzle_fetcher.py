@@ -44,6 +44,7 @@ SOURCE TRANSPARENCY
 """
 
 import os
+from array import array
 
 SCRIPT_DIR  = os.path.dirname(os.path.abspath(__file__))
 PUZZLES_DIR = os.path.join(SCRIPT_DIR, "..", "Puzzles")
@@ -254,12 +255,31 @@ FOUR_PUZZLES = [
 # ══════════════════════════════════════════════════════════════════════════════
 
 def _make_grid(n, clues):
-    """Build an n×n grid from (row, col, value) clue triples (0-indexed)."""
-    g = [[0]*n for _ in range(n)]
+    """
+    Build an n×n grid from (row, col, value) clue triples (0-indexed).
+    Rows are packed array('b') buffers (1 byte per cell, values <= 36);
+    they index, iterate and count() like lists of ints.
+    """
+    g = [array("b", bytes(n)) for _ in range(n)]
     for r, c, v in clues:
         g[r][c] = v
     return g
 
+
+def _add_clue(clues, masks, r, c, v, box, check=True):
+    """
+    Append clue (r, c, v) and mark v in its row / col / box bitmask.
+    With check, skip it (and return False) if v already sits in any of them.
+    """
+    rows, cols, boxes = masks
+    b   = (r // box) * box + c // box
+    bit = 1 << v
+    if check and (rows[r] | cols[c] | boxes[b]) & bit:
+        return False
+    rows[r] |= bit; cols[c] |= bit; boxes[b] |= bit
+    clues.append((r, c, v))
+    return True
+
 SIXTEEN_PUZZLES = [
     _make_grid(16, [
         (0,0,1),(0,4,2),(0,8,3),(0,12,4),
@@ -343,6 +363,7 @@ SIXTEEN_PUZZLES = [
 def _gen25_clues(offset=0):
     clues = []
     box = 5
+    masks = ([0] * 25, [0] * 25, [0] * 25)
     # Pass 1: one clue per 5×5 box
     for br in range(5):
         for bc in range(5):
@@ -350,7 +371,7 @@ def _gen25_clues(offset=0):
             r = br * box + (idx % box)
             c = bc * box + ((idx + offset) % box)
             v = ((idx + offset) % 25) + 1
-            clues.append((r, c, v))
+            _add_clue(clues, masks, r, c, v, box, check=False)
     # Pass 2: second clue per box with conflict check
     for br in range(5):
         for bc in range(5):
@@ -358,11 +379,7 @@ def _gen25_clues(offset=0):
             r = br * box + ((idx + 2) % box)
             c = bc * box + ((idx + offset + 3) % box)
             v = ((idx + offset + 12) % 25) + 1
-            row_v = {vv for rr,cc,vv in clues if rr == r}
-            col_v = {vv for rr,cc,vv in clues if cc == c}
-            box_v = {vv for rr,cc,vv in clues if (rr//box)==br and (cc//box)==bc}
-            if v not in row_v and v not in col_v and v not in box_v:
-                clues.append((r, c, v))
+            _add_clue(clues, masks, r, c, v, box)
     return clues
 
 TWENTY_FIVE_PUZZLES = [_make_grid(25, _gen25_clues(i)) for i in range(5)]
@@ -378,23 +395,20 @@ TWENTY_FIVE_PUZZLES = [_make_grid(25, _gen25_clues(i)) for i in range(5)]
 def _gen36_clues(offset=0):
     clues = []
     box = 6
+    masks = ([0] * 36, [0] * 36, [0] * 36)
     for br in range(6):
         for bc in range(6):
             idx = br * 6 + bc
             r = br * box + (idx % box)
             c = bc * box + ((idx + offset) % box)
             v = ((idx + offset) % 36) + 1
-            clues.append((r, c, v))
+            _add_clue(clues, masks, r, c, v, box, check=False)
         for bc in range(6):
             idx = br * 6 + bc
             r = br * box + ((idx + 3) % box)
             c = bc * box + ((idx + offset + 2) % box)
             v = ((idx + offset + 18) % 36) + 1
-            row_v = {vv for rr,cc,vv in clues if rr == r}
-            col_v = {vv for rr,cc,vv in clues if cc == c}
-            box_v = {vv for rr,cc,vv in clues if (rr//box)==br and (cc//box)==bc}
-            if v not in row_v and v not in col_v and v not in box_v:
-                clues.append((r, c, v))
+            _add_clue(clues, masks, r, c, v, box)
     return clues
 
 THIRTY_SIX_PUZZLES = [_make_grid(36, _gen36_clues(i)) for i in range(5)]
@@ -407,23 +421,23 @@ THIRTY_SIX_PUZZLES = [_make_grid(36, _gen36_clues(i)) for i in range(5)]
 def _validate(grid, n):
     import math
     box = int(math.sqrt(n))
-    errors = []
-    for r in range(n):
-        v = [grid[r][c] for c in range(n) if grid[r][c] != 0]
-        if len(v) != len(set(v)):
-            errors.append(f"row {r}")
-    for c in range(n):
-        v = [grid[r][c] for r in range(n) if grid[r][c] != 0]
-        if len(v) != len(set(v)):
-            errors.append(f"col {c}")
-    for br in range(0, n, box):
-        for bc in range(0, n, box):
-            v = [grid[br+dr][bc+dc]
-                 for dr in range(box) for dc in range(box)
-                 if grid[br+dr][bc+dc] != 0]
-            if len(v) != len(set(v)):
-                errors.append(f"box({br//box},{bc//box})")
-    return errors
+    # one pass with a bitmask per row / col / box; a set bit means a repeat
+    row_m, col_m, box_m = [0] * n, [0] * n, [0] * n
+    bad_r, bad_c, bad_b = set(), set(), set()
+    for r, line in enumerate(grid):
+        b0 = (r // box) * box
+        for c, v in enumerate(line):
+            if not v:
+                continue
+            bit = 1 << v
+            b   = b0 + c // box
+            if row_m[r] & bit: bad_r.add(r)
+            if col_m[c] & bit: bad_c.add(c)
+            if box_m[b] & bit: bad_b.add(b)
+            row_m[r] |= bit; col_m[c] |= bit; box_m[b] |= bit
+    return ([f"row {r}" for r in sorted(bad_r)] +
+            [f"col {c}" for c in sorted(bad_c)] +
+            [f"box({b // box},{b % box})" for b in sorted(bad_b)])
 
 
 # ══════════════════════════════════════════════════════════════════════════════
@@ -432,16 +446,15 @@ def _validate(grid, n):
 
 def save_puzzle(grid, n, name):
     path = os.path.join(PUZZLES_DIR, name + ".txt")
+    text = [str(v) for v in range(n + 1)].__getitem__   # cell values 0..n, str() once
+    body = "".join([" ".join(map(text, row)) + "\n" for row in grid])
     with open(path, "w") as f:
-        f.write(f"SIZE {n}\n")
-        f.write("PUZZLE\n")
-        for row in grid:
-            f.write(" ".join(str(v) for v in row) + "\n")
+        f.write(f"SIZE {n}\nPUZZLE\n{body}")
     return path
 
 
 def count_clues(grid):
-    return sum(v != 0 for row in grid for v in row)
+    return sum(len(row) - row.count(0) for row in grid)
 
 
 def fetch_all(verbose=True):
@@ -1,120 +1,233 @@
 import os
+import sys
 import csv
+import json
+import hashlib
+import functools
+import argparse
 import importlib.util
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 OUTPUT_DIR = os.path.join(SCRIPT_DIR, "..", "Output")
 CSV_PATH   = os.path.join(OUTPUT_DIR, "benchmark_results.csv")
+CACHE_PATH = os.path.join(OUTPUT_DIR, "rerun_cache.json")
 
 
 # ─────────────────────────────────────────────
 # Dynamic loader
 # ─────────────────────────────────────────────
 def _load(name):
+    if name in sys.modules:
+        return sys.modules[name]
     path = os.path.join(SCRIPT_DIR, name + ".py")
     spec = importlib.util.spec_from_file_location(name, path)
     mod  = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(mod)
+    sys.modules[name] = mod
+    try:
+        spec.loader.exec_module(mod)
+    except BaseException:
+        del sys.modules[name]
+        raise
     return mod
 
 
 # ─────────────────────────────────────────────
-# Remove ALL previous 9x9 rows
+# Result cache: puzzle text + solver/code contents -> row
 # ─────────────────────────────────────────────
-def clean_csv():
-    if not os.path.exists(CSV_PATH):
-        print("No existing CSV found.")
-        return []
+def load_cache():
+    try:
+        with open(CACHE_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
 
-    cleaned = []
-    with open(CSV_PATH, newline="") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            if row["size"] != "9":
-                cleaned.append(row)
 
-    print(f"Removed all previous 9x9 rows. Remaining rows: {len(cleaned)}")
-    return cleaned
+def save_cache(cache):
+    with open(CACHE_PATH, "w") as f:
+        json.dump(cache, f, indent=1)
+
+
+# Everything that runs to encode and solve a puzzle, this script included
+# since its worker drives both solvers; a missing file (an unbuilt
+# bt_kernel.so, say) hashes as absent.
+CODE_FILES = ["rerun_9x9_only.py", "sudoku_to_cnf.py", "_encode_numba.py",
+              "sat_solver_runner.py", "_ipasir.py",
+              "backtracking_solver.py", "_solve_numba.py", "_solver_ext.py",
+              "bt_kernel.c", "bt_kernel.so"]
+
+
+def _file_digest(path):
+    h = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+    except (OSError, TypeError):         # missing file, or no solver (None)
+        return "-"
+    return h.hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def _code_digest(solver):
+    """Digest of the solver binary and every file in CODE_FILES (once per run)."""
+    h = hashlib.sha256()
+    for path in [solver] + [os.path.join(SCRIPT_DIR, f) for f in CODE_FILES]:
+        h.update(_file_digest(path).encode())
+    return h.hexdigest()
+
+
+def cache_key(puzzle_path, solver):
+    """Changes whenever the puzzle, the SAT binary or any encode/solve code does."""
+    return _file_digest(puzzle_path) + ":" + _code_digest(solver)
 
 
 # ─────────────────────────────────────────────
-# Generic runner for a 9x9 puzzle set
+# One puzzle: encode + SAT + backtracking
 # ─────────────────────────────────────────────
-def run_9x9_group(puzzles, group_label, prefix):
-    fetcher = _load("puzzle_fetcher")
+def _run_one(job):
+    """Runs in a worker process; returns the CSV row for one puzzle."""
+    name, puzzle_path, group_label, solver = job
     enc     = _load("sudoku_to_cnf")
     bt_mod  = _load("backtracking_solver")
     sat_mod = _load("sat_solver_runner")
 
-    solver = sat_mod.find_solver(None)
-    results = []
+    row = dict(
+        group=group_label,
+        size=9,
+        puzzle=name,
+        cnf_vars=0,
+        cnf_clauses=0,
+        enc_time=0,
+        sat_time=float("nan"),
+        bt_time=float("nan"),
+        sat_status="skipped",
+        bt_status="skipped"
+    )
+
+    # Encode
+    cnf_path, n_vars, n_clauses, enc_time, cnf_data = enc.convert_file(
+        puzzle_path, verbose=False, return_data=True
+    )
+
+    row.update(
+        cnf_vars=n_vars,
+        cnf_clauses=n_clauses,
+        enc_time=enc_time
+    )
+
+    # SAT
+    if solver:
+        _, sat_time = sat_mod.solve_cnf(cnf_path, solver, verbose=False,
+                                        cnf_data=cnf_data)
+        row["sat_time"]   = sat_time if sat_time is not None else float("nan")
+        row["sat_status"] = "solved"
+
+    # Backtracking
+    _, bt_time = bt_mod.solve_puzzle(puzzle_path, verbose=False, timeout=600)
+
+    if bt_time == float("inf"):
+        row["bt_time"]   = float("inf")
+        row["bt_status"] = "timeout"
+    else:
+        row["bt_time"]   = bt_time
+        row["bt_status"] = "solved"
+
+    return row
+
+
+# ─────────────────────────────────────────────
+# Generic runner for a 9x9 puzzle set
+# ─────────────────────────────────────────────
+def run_9x9_group(puzzles, group_label, prefix, solver=None, cache=None, jobs=1):
+    """
+    With a cache dict, puzzles whose cache_key() is in it reuse the stored
+    results instead of being encoded and solved again; new results are
+    added to it.  The remaining puzzles are independent, so jobs > 1 runs
+    them in a process pool -- but their solves are timed, so as in
+    benchmark.py only jobs=1 (one at a time) gives comparable timings.
+    """
+    fetcher = _load("puzzle_fetcher")
+    solver  = solver or _load("sat_solver_runner").find_solver(None)
 
+    results, work, pending = [], [], []
     for i, grid in enumerate(puzzles, 1):
         name = f"{prefix}_{i:02d}"
         puzzle_path = fetcher.save_puzzle(grid, 9, name)
 
+        key = cache_key(puzzle_path, solver) if cache is not None else None
+        if key is not None and key in cache:
+            print(f"\nCached  {name}")
+            results.append(dict(cache[key], group=group_label, puzzle=name))
+            continue
+
         print(f"\nRunning {name}")
+        pending.append((len(results), key))
+        results.append(None)                     # filled in below
+        work.append((name, puzzle_path, group_label, solver))
 
-        row = dict(
-            group=group_label,
-            size=9,
-            puzzle=name,
-            cnf_vars=0,
-            cnf_clauses=0,
-            enc_time=0,
-            sat_time=float("nan"),
-            bt_time=float("nan"),
-            sat_status="skipped",
-            bt_status="skipped"
-        )
-
-        # Encode
-        cnf_path, n_vars, n_clauses, enc_time = enc.convert_file(
-            puzzle_path, verbose=False
-        )
-
-        row.update(
-            cnf_vars=n_vars,
-            cnf_clauses=n_clauses,
-            enc_time=enc_time
-        )
-
-        # SAT
-        if solver:
-            _, sat_time = sat_mod.solve_cnf(cnf_path, solver, verbose=False)
-            row["sat_time"]   = sat_time if sat_time is not None else float("nan")
-            row["sat_status"] = "solved"
-
-        # Backtracking
-        _, bt_time = bt_mod.solve_puzzle(puzzle_path, verbose=False, timeout=600)
-
-        if bt_time == float("inf"):
-            row["bt_time"]   = float("inf")
-            row["bt_status"] = "timeout"
-        else:
-            row["bt_time"]   = bt_time
-            row["bt_status"] = "solved"
-
-        results.append(row)
+    workers = max(1, jobs or 1)
+    ex = None
+    if work and workers > 1:
+        ex = _load("_pool_pin").pinned_pool(workers)
+    try:
+        # both map()s yield in submission order, so rows line up with pending
+        rows = ex.map(_run_one, work, chunksize=1) if ex else map(_run_one, work)
+        for (idx, key), row in zip(pending, rows):
+            results[idx] = row
+            if cache is not None:
+                cache[key] = row
+    finally:
+        if ex is not None:
+            ex.shutdown()
 
     return results
 
 
 # ─────────────────────────────────────────────
-# Rewrite CSV
+# Rewrite CSV: drop ALL previous 9x9 rows, append the new ones
 # ─────────────────────────────────────────────
 def rewrite_csv(rows):
+    """
+    Streams the old CSV through a filter into CSV_PATH.tmp, appends `rows`,
+    then os.replace()s it over the original: one pass, no in-memory copy,
+    and an interrupted run leaves the old file intact.  The old header is
+    kept; columns the new rows lack are left empty, and a CSV without a
+    "size" column keeps all of its rows.
+    """
     if not rows:
         print("No rows to write.")
         return
 
-    fieldnames = list(rows[0].keys())
+    tmp = CSV_PATH + ".tmp"
+    try:
+        with open(tmp, "w", newline="") as fout:
+            writer = csv.writer(fout)
+            if os.path.exists(CSV_PATH):
+                with open(CSV_PATH, newline="") as fin:
+                    reader     = csv.reader(fin)
+                    fieldnames = next(reader, None) or list(rows[0].keys())
+                    writer.writerow(fieldnames)
+                    size = fieldnames.index("size") if "size" in fieldnames else None
+                    kept = 0
+                    for row in reader:
+                        if size is None or size >= len(row) or row[size] != "9":
+                            writer.writerow(row)
+                            kept += 1
+                if size is None:
+                    print(f"No size column; kept all {kept} existing rows.")
+                else:
+                    print(f"Removed all previous 9x9 rows. Remaining rows: {kept}")
+            else:
+                print("No existing CSV found.")
+                fieldnames = list(rows[0].keys())
+                writer.writerow(fieldnames)
 
-    with open(CSV_PATH, "w", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(rows)
+            writer.writerows([r.get(f, "") for f in fieldnames] for r in rows)
 
+        os.replace(tmp, CSV_PATH)
+    finally:
+        if os.path.exists(tmp):          # only left behind if something failed
+            os.remove(tmp)
     print(f"\nUpdated CSV -> {CSV_PATH}")
 
 
@@ -122,22 +235,36 @@ def rewrite_csv(rows):
 # Main
 # ─────────────────────────────────────────────
 if __name__ == "__main__":
-    fetcher = _load("puzzle_fetcher")
+    parser = argparse.ArgumentParser(description="Re-run the 9x9 rows of benchmark_results.csv")
+    parser.add_argument("--no-cache", action="store_true",
+                        help=f"Solve every puzzle again, ignoring {os.path.basename(CACHE_PATH)}")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Worker processes (default 1; more makes the timings unreliable)")
+    args = parser.parse_args()
 
-    cleaned_rows = clean_csv()
+    fetcher = _load("puzzle_fetcher")
+    solver  = _load("sat_solver_runner").find_solver(None)
+    cache   = {} if args.no_cache else load_cache()
 
     # 17-clue group
     rows_17 = run_9x9_group(
         puzzles=fetcher.NINE_17_CLUE,
         group_label="17-clue",
-        prefix="sudoku_9x9_17clue"
+        prefix="sudoku_9x9_17clue",
+        solver=solver,
+        cache=cache,
+        jobs=args.jobs
     )
 
     # 20+ clue group
     rows_20 = run_9x9_group(
         puzzles=fetcher.NINE_HIGHER_CLUE,
         group_label="20plus-clue",
-        prefix="sudoku_9x9_20plus"
+        prefix="sudoku_9x9_20plus",
+        solver=solver,
+        cache=cache,
+        jobs=args.jobs
     )
 
-    rewrite_csv(cleaned_rows + rows_17 + rows_20)
+    save_cache(cache)
+    rewrite_csv(rows_17 + rows_20)
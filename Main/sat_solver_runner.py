@@ -4,8 +4,13 @@ import argparse
 import time
 import re
 import sys
+import shutil
+import threading
 
 SCRIPT_DIR  = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPT_DIR)
+import _ipasir
+
 CNF_DIR     = os.path.join(SCRIPT_DIR, "..", "CNF")
 SOL_DIR     = os.path.join(SCRIPT_DIR, "..", "Output", "Sol")
 TEMP_DIR    = os.path.join(SCRIPT_DIR, "..", "Temp")
@@ -27,70 +32,149 @@ def find_solver(preferred=None):
         candidates.append(name)
 
     for c in candidates:
-        if os.path.isfile(c) and os.access(c, os.X_OK):
+        if os.path.isfile(c) and (os.access(c, os.X_OK) or _ipasir.is_library(c)):
             return c
-        try:
-            r = subprocess.run(["which", c], capture_output=True, text=True)
-            if r.returncode == 0:
-                return r.stdout.strip()
-        except FileNotFoundError:
-            pass
+        found = shutil.which(c)
+        if found:
+            return found
     return None
 
 
 # ── run solver ─────────────────────────────────────────────────────────────────
 
-def run_solver(solver, cnf_path, timeout=3600):
+def _add_positive(assignment, tokens):
+    """Append the positive literals among `tokens`; non-integer tokens are skipped."""
+    try:
+        lits = list(map(int, tokens))        # one conversion pass per line
+    except ValueError:                       # rare: fall back to per token
+        lits = []
+        for tok in tokens:
+            try:
+                lits.append(int(tok))
+            except ValueError:
+                pass
+    assignment.extend(lit for lit in lits if lit > 0)
+
+
+# Solvers confirmed to read DIMACS from stdin when given "-": satch's usage
+# text says so ("... be '-' in which case the input is read from <stdin>").
+# Anything else gets the file.
+STDIN_SOLVERS = ("satch",)
+
+
+def _spawn(cmd, timeout, stdin_data=None):
+    """
+    Run one solver process.  Returns (killed, returncode, verdict, s_line,
+    positive "v" literals, first output lines, elapsed): verdict is "SAT" /
+    "UNSAT" from any banner text, s_line the same from a DIMACS "s" line
+    only ("" if there was none).
+    """
+    # Stream stdout (stderr merged in, so neither pipe can fill up and
+    # stall the solver) and keep only the positive "v" literals, rather
+    # than buffering the whole model text until the solver exits.
+    t0    = time.time()
+    proc  = subprocess.Popen(cmd, stdout=subprocess.PIPE,
+                             stderr=subprocess.STDOUT, text=True,
+                             stdin=subprocess.PIPE if stdin_data is not None else None)
+    killed = threading.Event()
+
+    def kill():
+        killed.set()
+        proc.kill()
+
+    timer = threading.Timer(timeout, kill)
+    timer.start()
+    if stdin_data is not None:
+        # feed stdin from a thread: the solver may print before it has
+        # read everything, and stdout is drained below
+        def feed():
+            try:
+                proc.stdin.buffer.write(stdin_data)
+                proc.stdin.close()
+            except OSError:               # solver exited or was killed
+                pass
+        threading.Thread(target=feed, daemon=True).start()
+    assignment, verdict, s_line, head = [], "", "", []
+    try:
+        for line in proc.stdout:
+            s = line.strip()
+            if s.startswith("v ") or s == "v":
+                _add_positive(assignment, s.split()[1:])
+                continue
+            if len(head) < 10:
+                head.append(line)
+            if s == "s SATISFIABLE":
+                s_line = "SAT"
+            elif s == "s UNSATISFIABLE":
+                s_line = "UNSAT"
+            # check UNSATISFIABLE BEFORE SATISFIABLE because
+            # "UNSATISFIABLE" contains "SATISFIABLE" as a substring!
+            if "UNSATISFIABLE" in s:
+                verdict = "UNSAT"
+            elif "SATISFIABLE" in s and not verdict:
+                verdict = "SAT"
+        proc.wait()
+    finally:
+        timer.cancel()
+        proc.stdout.close()
+    return (killed.is_set(), proc.returncode, verdict, s_line,
+            assignment, head, time.time() - t0)
+
+
+def run_solver(solver, cnf_path, timeout=3600, cnf_data=None):
+    """
+    cnf_data, if given, is the DIMACS text of cnf_path as bytes (see
+    sudoku_to_cnf.convert_file(return_data=True)); STDIN_SOLVERS, and IPASIR
+    libraries, take it from memory instead of the file.  A stdin run only
+    counts if the solver printed an "s SATISFIABLE" / "s UNSATISFIABLE"
+    line; otherwise the solver is run again on the file.
+    """
+    # IPASIR shared library: solve in-process, no solver subprocess
+    if _ipasir.is_library(solver):
+        t0 = time.time()
+        status, assignment = _ipasir.solve_dimacs(solver, cnf_path, timeout, cnf_data)
+        return status == _ipasir.SAT, assignment, time.time() - t0
+
     solver_name = os.path.basename(solver).lower()
     out_file    = os.path.join(TEMP_DIR, os.path.basename(cnf_path) + ".out")
 
+    if cnf_data is not None and solver_name in STDIN_SOLVERS:
+        killed, rc, verdict, s_line, assignment, head, elapsed = \
+            _spawn([solver, "-"], timeout, cnf_data)
+        if killed:
+            return False, [], elapsed
+        if s_line:
+            if s_line != "SAT":
+                return False, [], elapsed
+            return True, assignment, elapsed
+        print(f"\n  [WARN] no s-line from {solver_name} reading stdin "
+              f"(returncode={rc}); running it on {os.path.basename(cnf_path)}")
+
     if "minisat" in solver_name:
-        cmd = [solver, cnf_path, out_file]
+        cmd = [solver, cnf_path, out_file]   # needs real filenames
     else:
         cmd = [solver, cnf_path]   # satch, picosat
-
-    t0 = time.time()
-    try:
-        proc = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
-    except subprocess.TimeoutExpired:
-        return False, [], time.time() - t0
-    elapsed = time.time() - t0
+    killed, rc, verdict, s_line, assignment, head, elapsed = _spawn(cmd, timeout)
+    if killed:
+        return False, [], elapsed
 
     # ── SAT/UNSAT decision ─────────────────────────────────────
     # returncode: satch uses 10=SAT, 20=UNSAT (IPASIR standard)
-    if proc.returncode == 10:
+    if rc == 10:
         sat = True
-    elif proc.returncode == 20:
+    elif rc == 20:
         sat = False
+    elif verdict:
+        # Fallback: the s-line / banner text seen while streaming
+        sat = verdict == "SAT"
     else:
-        # Fallback text parsing — check UNSATISFIABLE BEFORE SATISFIABLE
-        # because "UNSATISFIABLE" contains "SATISFIABLE" as a substring!
-        combined = proc.stdout + proc.stderr
-        if "UNSATISFIABLE" in combined:
-            sat = False
-        elif "SATISFIABLE" in combined:
-            sat = True
-        else:
-            print(f"\n  [WARN] returncode={proc.returncode}, no SAT/UNSAT in output")
-            print(f"  stdout: {proc.stdout[:300]}")
-            sat = False
+        print(f"\n  [WARN] returncode={rc}, no SAT/UNSAT in output")
+        print(f"  stdout: {''.join(head)[:300]}")
+        sat = False
 
     if not sat:
         return False, [], elapsed
 
-    # ── parse "v" lines for variable assignment ────────────────
-    assignment = []
-    for line in proc.stdout.splitlines():
-        s = line.strip()
-        if s.startswith("v ") or s == "v":
-            for tok in s.split()[1:]:
-                try:
-                    lit = int(tok)
-                    if lit != 0 and lit > 0:
-                        assignment.append(lit)
-                except ValueError:
-                    pass
-
     # minisat writes assignment to file
     if not assignment and os.path.exists(out_file):
         with open(out_file) as f:
@@ -98,13 +182,7 @@ def run_solver(solver, cnf_path, timeout=3600):
         for line in content.splitlines():
             if line.strip() in ("SAT", "UNSAT", ""):
                 continue
-            for tok in line.split():
-                try:
-                    lit = int(tok)
-                    if lit > 0:
-                        assignment.append(lit)
-                except ValueError:
-                    pass
+            _add_positive(assignment, line.split())
 
     return True, assignment, elapsed
 
@@ -113,17 +191,16 @@ def run_solver(solver, cnf_path, timeout=3600):
 
 def decode_solution(assignment, puzzle_path):
     sys.path.insert(0, SCRIPT_DIR)
-    from sudoku_to_cnf import read_puzzle, encode
+    from sudoku_to_cnf import read_puzzle, partition_vars
 
-    n, puzzle    = read_puzzle(puzzle_path)
-    _, _, var_map, _ = encode(n, puzzle)
-    inv_map      = {idx: triple for triple, idx in var_map.items()}
-    true_set     = set(assignment)
+    n, puzzle     = read_puzzle(puzzle_path)
+    _, _, V0_list = partition_vars(n, puzzle)   # DIMACS var k -> V0_list[k-1]
+    true_set      = set(assignment)
 
     grid = [row[:] for row in puzzle]
     for var_idx in true_set:
-        if var_idx in inv_map:
-            r, c, v = inv_map[var_idx]
+        if 1 <= var_idx <= len(V0_list):
+            r, c, v = V0_list[var_idx - 1]
             grid[r - 1][c - 1] = v
     return grid, n
 
@@ -135,33 +212,44 @@ def save_solution(grid, n, basename, sat_time, assignment):
     with open(out, "w+") as f:
         f.write(f"SIZE {n}\nSOLVE_TIME_SEC {sat_time:.4f}\n")
         f.write("METHOD SAT\nSTATUS SOLVED\nSOLUTION\n")
-        for row in grid:
-            f.write(" ".join(str(v) for v in row) + "\n")
-        for x in assignment: 
-            f.write(str(x))
+        f.write("".join(" ".join(map(str, row)) + "\n" for row in grid))
+        f.write("ASSIGNMENT\n" + " ".join(map(str, assignment)) + "\n")
     return out
 
 
+_puzzle_index = {}   # basename -> path in PUZZLES_DIR, for non-.txt puzzles
+
+def cnf_basename(cnf_path):
+    """Puzzle name of a .cnf or .cnf.gz path."""
+    name = os.path.basename(cnf_path)
+    if name.endswith(".gz"):
+        name = name[:-3]
+    return os.path.splitext(name)[0]
+
+
 def find_puzzle_for_cnf(cnf_path):
-    basename = os.path.splitext(os.path.basename(cnf_path))[0]
+    basename = cnf_basename(cnf_path)
     p = os.path.join(PUZZLES_DIR, basename + ".txt")
     if os.path.exists(p):
         return p
-    for f in os.listdir(PUZZLES_DIR):
-        if os.path.splitext(f)[0] == basename:
-            return os.path.join(PUZZLES_DIR, f)
-    return None
+    if basename not in _puzzle_index:
+        # rescan: the puzzle may have been written since the last listing
+        _puzzle_index.clear()
+        for f in os.listdir(PUZZLES_DIR):
+            _puzzle_index.setdefault(os.path.splitext(f)[0],
+                                     os.path.join(PUZZLES_DIR, f))
+    return _puzzle_index.get(basename)
 
 
 # ── public API ─────────────────────────────────────────────────────────────────
 
-def solve_cnf(cnf_path, solver, verbose=True, timeout=3600):
-    basename = os.path.splitext(os.path.basename(cnf_path))[0]
+def solve_cnf(cnf_path, solver, verbose=True, timeout=3600, cnf_data=None):
+    basename = cnf_basename(cnf_path)
     if verbose:
         print(f"  SAT {os.path.basename(cnf_path)} ...", end=" ", flush=True)
 
-    sat, assignment, elapsed = run_solver(solver, cnf_path, timeout=timeout)
-    print(assignment)
+    sat, assignment, elapsed = run_solver(solver, cnf_path, timeout=timeout,
+                                          cnf_data=cnf_data)
     if not sat:
         if verbose:
             print(f"✗ UNSAT/ERROR ({elapsed:.3f}s)")
@@ -190,7 +278,8 @@ def solve_cnf(cnf_path, solver, verbose=True, timeout=3600):
 def main():
     p = argparse.ArgumentParser()
     p.add_argument("--cnf")
-    p.add_argument("--solver")
+    p.add_argument("--solver",
+                   help="solver executable, or an IPASIR .so to solve in-process")
     p.add_argument("--timeout", type=int, default=3600)
     args = p.parse_args()
 
@@ -201,7 +290,8 @@ def main():
     print(f"Solver: {solver}\n")
 
     files = [args.cnf] if args.cnf else sorted(
-        os.path.join(CNF_DIR, f) for f in os.listdir(CNF_DIR) if f.endswith(".cnf")
+        os.path.join(CNF_DIR, f) for f in os.listdir(CNF_DIR)
+        if f.endswith((".cnf", ".cnf.gz"))
     )
     for cnf in files:
         solve_cnf(cnf, solver, timeout=args.timeout)
@@ -40,10 +40,13 @@ def generate_solution(n):
     cols  = [g * base + c for g in shuffle(range(base)) for c in shuffle(range(base))]
     nums  = shuffle(range(1, side + 1))
 
-    grid = [
-        [nums[pattern(r, c, base, side)] for c in cols]
-        for r in rows
-    ]
+    # pattern(r, c) == (pattern(r, 0) + c) % side, so each row is `nums`
+    # rotated by pattern(r, 0) and then indexed by cols, done in C by map()
+    grid = []
+    for r in rows:
+        k    = pattern(r, 0, base, side)
+        ring = nums[k:] + nums[:k]
+        grid.append(list(map(ring.__getitem__, cols)))
 
     return grid
 
@@ -84,14 +87,13 @@ def save_puzzle(puzzle, solution, n, puzzle_id):
         f"sudoku_{n}x{n}_{puzzle_id:03d}.txt"
     )
 
+    text = [str(v) for v in range(n + 1)].__getitem__   # cell values 0..n, str() once
+
+    def rows(grid):
+        return "".join([" ".join(map(text, row)) + "\n" for row in grid])
+
     with open(filename, "w") as f:
-        f.write(f"SIZE {n}\n")
-        f.write("PUZZLE\n")
-        for row in puzzle:
-            f.write(" ".join(str(v) for v in row) + "\n")
-        f.write("SOLUTION\n")
-        for row in solution:
-            f.write(" ".join(str(v) for v in row) + "\n")
+        f.write(f"SIZE {n}\nPUZZLE\n{rows(puzzle)}SOLUTION\n{rows(solution)}")
 
     return filename
 